@@ -0,0 +1,32 @@
+"""Compute invoice item totals in the database
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A plain column cannot be altered into a generated one, so recreate it
+    op.drop_column('invoice_items', 'total')
+    op.add_column(
+        'invoice_items',
+        sa.Column('total', sa.Numeric(10, 2), sa.Computed('quantity * unit_price', persisted=True), nullable=False)
+    )
+
+
+def downgrade() -> None:
+    # Restore the plain column, keeping the computed values
+    op.add_column('invoice_items', sa.Column('total_plain', sa.Numeric(10, 2), nullable=True))
+    op.execute('UPDATE invoice_items SET total_plain = total')
+    op.drop_column('invoice_items', 'total')
+    op.alter_column('invoice_items', 'total_plain', new_column_name='total', nullable=False)
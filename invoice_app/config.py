@@ -5,7 +5,10 @@ class Settings(BaseSettings):
     """Application settings."""
     
     # Database settings
-    DATABASE_URL: str = "postgresql://postgres:postgres@db:5432/invoice_db"
+    DATABASE_URL: str = "postgresql+psycopg://postgres:postgres@db:5432/invoice_db"
+    
+    # Celery settings
+    CELERY_BROKER_URL: str = "redis://redis:6379/0"
     
     # API settings
     API_V1_STR: str = "/api"
@@ -1,8 +1,9 @@
 from typing import List, Optional
 from uuid import uuid4
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, insert, select
 from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
 import logging
 
 from invoice_app.models.invoice import (
@@ -38,6 +39,29 @@ def get_invoices(
 
     return query.order_by(InvoiceDB.created_at.desc()).offset(skip).limit(limit).all()
 
+def _insert_items(db: Session, invoice_id: str, rows: List[dict]) -> None:
+    """Bulk insert invoice item rows; line totals are computed by the database."""
+    if rows:
+        db.execute(
+            insert(InvoiceItemDB),
+            [{"id": str(uuid4()), "invoice_id": invoice_id, **row} for row in rows]
+        )
+
+# Invoice amounts derived from the items and tax_rate; client-sent values are ignored
+_DERIVED_FIELDS = ("subtotal", "tax", "total")
+
+def _apply_item_totals(db: Session, db_invoice: InvoiceDB) -> None:
+    """Set subtotal from a SUM over the stored items, then tax from tax_rate and total."""
+    subtotal = Decimal(str(db.execute(
+        select(func.coalesce(func.sum(InvoiceItemDB.total), 0))
+        .where(InvoiceItemDB.invoice_id == db_invoice.id)
+    ).scalar()))
+    tax_rate = Decimal(str(db_invoice.tax_rate if db_invoice.tax_rate is not None else 0))
+    tax = (subtotal * tax_rate / 100).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    db_invoice.subtotal = subtotal
+    db_invoice.tax = tax
+    db_invoice.total = subtotal + tax
+
 def create_invoice(db: Session, invoice: InvoiceCreate) -> InvoiceDB:
     """Create new invoice."""
     try:
@@ -52,27 +76,29 @@ def create_invoice(db: Session, invoice: InvoiceCreate) -> InvoiceDB:
             issue_date=invoice.issue_date,
             due_date=invoice.due_date,
             status=invoice.status,
-            subtotal=invoice.subtotal,
-            tax=invoice.tax,
-            total=invoice.total,
+            # Amounts are placeholders until _apply_item_totals runs below
+            subtotal=0,
+            tax=0,
+            total=0,
             notes=invoice.notes,
             recipient_email=invoice.recipient_email,
             currency_code=invoice.currency_code
         )
+        if invoice.tax_rate is not None:
+            db_invoice.tax_rate = invoice.tax_rate
         db.add(db_invoice)
         db.flush()  # Flush to get the ID for invoice items
 
         # Create invoice items
-        for item in invoice.items:
-            db_item = InvoiceItemDB(
-                id=str(uuid4()),
-                invoice_id=db_invoice.id,
-                description=item.description,
-                quantity=item.quantity,
-                unit_price=item.unit_price,
-                total=item.total
-            )
-            db.add(db_item)
+        _insert_items(db, db_invoice.id, [
+            {
+                "description": item.description,
+                "quantity": item.quantity,
+                "unit_price": item.unit_price
+            }
+            for item in invoice.items
+        ])
+        _apply_item_totals(db, db_invoice)
 
         db.commit()
         db.refresh(db_invoice)
@@ -101,6 +127,8 @@ def update_invoice(
         # Get update data excluding items
         update_data = invoice_update.model_dump(exclude_unset=True)
         items_data = update_data.pop('items', None)
+        for field in _DERIVED_FIELDS:
+            update_data.pop(field, None)
 
         logger.debug(f"Updating invoice fields: {update_data}")
 
@@ -118,16 +146,17 @@ def update_invoice(
             db.query(InvoiceItemDB).filter(InvoiceItemDB.invoice_id == invoice_id).delete()
 
             # Create new items
-            for item in items_data:
-                db_item = InvoiceItemDB(
-                    id=str(uuid4()),
-                    invoice_id=invoice_id,
-                    description=item.get('description', '') or 'Unnamed item',
-                    quantity=float(item.get('quantity', 1)),
-                    unit_price=float(item.get('unit_price', 0)),
-                    total=float(item.get('total', 0))
-                )
-                db.add(db_item)
+            _insert_items(db, invoice_id, [
+                {
+                    "description": item.get('description', '') or 'Unnamed item',
+                    "quantity": float(item.get('quantity', 1)),
+                    "unit_price": float(item.get('unit_price', 0))
+                }
+                for item in items_data
+            ])
+
+        # Items or tax_rate may have changed; derive the amounts from what is stored
+        _apply_item_totals(db, db_invoice)
 
         try:
             db.commit()
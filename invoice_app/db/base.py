@@ -1,22 +1,31 @@
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
 from contextlib import contextmanager
-from typing import Generator
+from typing import Callable, Generator
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 # Get database URL from environment variable with fallback
 DATABASE_URL = os.getenv(
     "DATABASE_URL",
-    "postgresql://postgres:postgres@db:5432/invoice_db"
+    "postgresql+psycopg://postgres:postgres@db:5432/invoice_db"
 )
 
 # Create database engine with optimized settings
 engine = create_engine(
     DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
+    poolclass=QueuePool,
+    pool_pre_ping=True,  # Replace connections the server dropped
+    pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "5")),
+    pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),  # Seconds to wait for a free connection
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),  # Reconnect before idle timeouts close the socket
+    # psycopg 3 prepares a query server-side once it has run this many times on a connection
+    connect_args={"prepare_threshold": int(os.getenv("DB_PREPARE_THRESHOLD", "5"))},
     echo=os.getenv("DEBUG", "False").lower() in ("true", "1", "t")  # Only enable SQL logging in debug mode
 )
 
@@ -30,19 +39,64 @@ SessionLocal = sessionmaker(
 # Create base class for declarative models
 Base = declarative_base()
 
+# Session.info key holding callbacks to run after commit
+_AFTER_COMMIT_KEY = "after_commit_callbacks"
+
 @contextmanager
 def get_db_session() -> Generator[Session, None, None]:
-    """Provide a transactional scope around a series of operations."""
+    """Provide a transactional scope around a series of operations.
+
+    The whole scope is one unit of work: it is committed once on success
+    and rolled back on error, so services only need to flush.
+    """
     session = SessionLocal()
     try:
         yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
     finally:
         session.close()
 
+def run_after_commit(session: Session, callback: Callable[[], None]) -> None:
+    """Run a callback once the session's current transaction commits.
+
+    Callbacks are discarded if the transaction rolls back instead.
+    """
+    session.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session: Session) -> None:
+    """Run callbacks registered with run_after_commit.
+
+    The transaction is already durable, so a failing callback is logged
+    instead of raised, and the remaining callbacks still run.
+    """
+    for callback in session.info.pop(_AFTER_COMMIT_KEY, []):
+        try:
+            callback()
+        except Exception:
+            logger.exception("After-commit callback %r failed", callback)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit_callbacks(session: Session) -> None:
+    """Drop callbacks of a transaction that did not commit."""
+    session.info.pop(_AFTER_COMMIT_KEY, None)
+
 def get_db() -> Generator[Session, None, None]:
-    """FastAPI dependency for database sessions."""
-    with get_db_session() as session:
+    """FastAPI dependency for database sessions.
+
+    Unlike get_db_session this does not commit: FastAPI runs dependency
+    teardown after the response is sent, so a failed commit there would be
+    invisible to a client that already got a 200. Routes commit before
+    returning; anything left uncommitted is rolled back on close.
+    """
+    session = SessionLocal()
+    try:
         yield session
+    finally:
+        session.close()
 
 # Database initialization and cleanup functions
 def init_db() -> None:
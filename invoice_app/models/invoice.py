@@ -3,7 +3,7 @@ Invoice model for managing customer invoices.
 """
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import Column, String, DateTime, Numeric, ForeignKey, Text, Enum
+from sqlalchemy import Column, String, DateTime, Numeric, ForeignKey, Text, Enum, Computed, Index, text
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel, EmailStr
 import enum
@@ -22,6 +22,10 @@ class InvoiceDB(Base):
     """Invoice database model."""
 
     __tablename__ = "invoices"
+    __table_args__ = (
+        # Overdue checks only scan sent invoices, a small slice of the table
+        Index("ix_invoices_sent_due", "due_date", postgresql_where=text("status = 'sent'")),
+    )
 
     id = Column(String(36), primary_key=True, index=True)
     invoice_number = Column(String(50), unique=True, nullable=False, index=True)
@@ -54,7 +58,7 @@ class InvoiceItemDB(Base):
     description = Column(String(255), nullable=False)
     quantity = Column(Numeric(10, 2), nullable=False)
     unit_price = Column(Numeric(10, 2), nullable=False)
-    total = Column(Numeric(10, 2), nullable=False)
+    total = Column(Numeric(10, 2), Computed("quantity * unit_price", persisted=True), nullable=False)
 
     # Relationships
     invoice = relationship("InvoiceDB", back_populates="items")
@@ -64,7 +68,7 @@ class InvoiceItemBase(BaseModel):
     description: str
     quantity: float
     unit_price: float
-    total: float
+    total: float = 0.0  # Computed as quantity * unit_price; ignored on input
 
 class InvoiceItemCreate(InvoiceItemBase):
     pass
@@ -82,10 +86,11 @@ class InvoiceBase(BaseModel):
     issue_date: datetime
     due_date: datetime
     status: InvoiceStatus  # Use enum type for validation
-    subtotal: float
-    tax: float
+    # subtotal, tax and total are computed from the items and tax_rate; ignored on input
+    subtotal: float = 0.0
+    tax: float = 0.0
     tax_rate: Optional[float] = 20.0  # Default 20% tax rate
-    total: float
+    total: float = 0.0
     notes: Optional[str] = None
     recipient_email: Optional[str] = None  # Field for recipient email
     currency_code: Optional[str] = "USD"  # Field for currency
@@ -103,10 +108,10 @@ class InvoiceUpdate(BaseModel):
     issue_date: Optional[datetime] = None
     due_date: Optional[datetime] = None
     status: Optional[InvoiceStatus] = None
-    subtotal: Optional[float] = None
-    tax: Optional[float] = None
+    subtotal: Optional[float] = None  # Ignored; recomputed from the items
+    tax: Optional[float] = None  # Ignored; recomputed from tax_rate
     tax_rate: Optional[float] = None
-    total: Optional[float] = None
+    total: Optional[float] = None  # Ignored; recomputed as subtotal + tax
     notes: Optional[str] = None
     recipient_email: Optional[str] = None
     currency_code: Optional[str] = None
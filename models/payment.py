@@ -49,7 +49,7 @@ class Payment(UUIDMixin, TimestampMixin, Base):
     # Payment details
     amount = Column(Float, nullable=False)
     payment_method = Column(Enum(PaymentMethod), nullable=False, default=PaymentMethod.OTHER)
-    payment_date = Column(DateTime, nullable=False, default=datetime.now, index=True)
+    payment_date = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
     reference = Column(String(100))  # Transaction reference number
     notes = Column(Text)
     status = Column(Enum(PaymentStatus), nullable=False, default=PaymentStatus.COMPLETED)
@@ -5,6 +5,7 @@ This module contains the abstract base class for all repositories,
 defining common methods and patterns for data access operations.
 """
 from abc import ABC, abstractmethod
+from datetime import date, datetime
 from typing import Generic, TypeVar, List, Optional, Dict, Any, Type, Union
 from sqlalchemy.orm import Session
 
@@ -13,6 +14,22 @@ from invoice_app.db.base import Base
 T = TypeVar('T', bound=Base)
 
 
+def isoformat_or_none(value: Optional[Union[date, datetime]]) -> Optional[str]:
+    """
+    Convert a date/datetime to an ISO 8601 string, passing None through.
+
+    Used by the repositories' to_dict methods so each instrumented column
+    attribute is read once per row instead of twice.
+
+    Args:
+        value: Date or datetime value, or None
+
+    Returns:
+        ISO 8601 string, or None if value is None
+    """
+    return value.isoformat() if value is not None else None
+
+
 class BaseRepository(Generic[T], ABC):
     """
     Abstract base repository providing common data access patterns.
@@ -57,7 +74,7 @@ class BaseRepository(Generic[T], ABC):
         Returns:
             Entity instance if found, None otherwise
         """
-        return self.session.query(self.model_class).get(entity_id)
+        return self.session.get(self.model_class, entity_id)
 
     def get_by_uuid(self, uuid: str) -> Optional[T]:
         """
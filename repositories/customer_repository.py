@@ -9,7 +9,7 @@ from sqlalchemy import and_, or_, func
 from sqlalchemy.orm import Session, joinedload
 
 from invoice_app.models.customer import CustomerDB as Customer
-from repositories.base_repository import BaseRepository
+from repositories.base_repository import BaseRepository, isoformat_or_none
 
 
 class CustomerRepository(BaseRepository[Customer]):
@@ -136,6 +136,6 @@ class CustomerRepository(BaseRepository[Customer]):
             'postal_code': customer.postal_code,
             'country': customer.country,
             'notes': customer.notes,
-            'created_at': customer.created_at.isoformat() if customer.created_at else None,
-            'updated_at': customer.updated_at.isoformat() if customer.updated_at else None,
+            'created_at': isoformat_or_none(customer.created_at),
+            'updated_at': isoformat_or_none(customer.updated_at),
         }
\ No newline at end of file
@@ -4,14 +4,17 @@ Invoice repository module.
 This module contains the repository class for invoice-related data access operations.
 """
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any, Tuple, Union
+from typing import Iterator, List, Optional, Dict, Any, Tuple, Union
 
-from sqlalchemy import and_, or_, desc, func
+from sqlalchemy import (
+    DateTime, Row, String, and_, bindparam, case, column, literal, or_, desc, func, select, text, update,
+    values
+)
 from sqlalchemy.orm import Session, joinedload
 
 from app.models.invoice import Invoice, InvoiceStatus
 from app.models.customer import Customer
-from app.repositories.base_repository import BaseRepository
+from app.repositories.base_repository import BaseRepository, isoformat_or_none
 
 
 class InvoiceRepository(BaseRepository[Invoice]):
@@ -109,9 +112,10 @@ class InvoiceRepository(BaseRepository[Invoice]):
         """
         invoice = self.get_by_id(invoice_id)
         if invoice and invoice.status == InvoiceStatus.DRAFT:
+            now = datetime.now()
             invoice.status = InvoiceStatus.SENT
-            invoice.sent_date = sent_date or datetime.now()
-            invoice.updated_at = datetime.now()
+            invoice.sent_date = sent_date or now
+            invoice.updated_at = now
             return invoice
         return None
 
@@ -128,12 +132,46 @@ class InvoiceRepository(BaseRepository[Invoice]):
         """
         invoice = self.get_by_id(invoice_id)
         if invoice and invoice.status in [InvoiceStatus.SENT, InvoiceStatus.REMINDER_SENT]:
+            now = datetime.now()
             invoice.status = InvoiceStatus.PAID
-            invoice.payment_date = payment_date or datetime.now()
-            invoice.updated_at = datetime.now()
+            invoice.payment_date = payment_date or now
+            invoice.updated_at = now
             return invoice
         return None
 
+    def apply_refund(self, invoice_id: int, refund_amount: float) -> Optional[Invoice]:
+        """
+        Subtract a refund from an invoice's paid amount in a single UPDATE.
+
+        The status is recomputed in the same statement, so concurrent refunds
+        cannot race on a read-modify-write of amount_paid.
+
+        Args:
+            invoice_id: ID of invoice to update
+            refund_amount: Amount being refunded
+
+        Returns:
+            Updated invoice if found, None otherwise
+        """
+        amount_paid = Invoice.amount_paid - refund_amount
+
+        return self.session.execute(
+            update(Invoice)
+            .where(Invoice.id == invoice_id)
+            .values(
+                amount_paid=amount_paid,
+                status=case(
+                    (and_(amount_paid < Invoice.total, amount_paid > 0),
+                     literal(InvoiceStatus.PARTIALLY_PAID, Invoice.status.type)),
+                    (amount_paid < Invoice.total, literal(InvoiceStatus.SENT, Invoice.status.type)),
+                    else_=Invoice.status
+                ),
+                updated_at=func.now()
+            )
+            .returning(Invoice)
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+
     def find_invoices_for_reminder(self, days_threshold: int) -> List[Invoice]:
         """
         Find invoices that need reminders.
@@ -165,6 +203,240 @@ class InvoiceRepository(BaseRepository[Invoice]):
 
         return query.all()
 
+    def estimated_overdue_count(self, owner_id: str) -> int:
+        """
+        Estimate how many overdue invoices an owner has, without counting them.
+
+        Reads the planner's row estimate from EXPLAIN, which takes constant
+        time; use it for progress and totals where an exact COUNT(*) over a
+        large owner is not worth a scan.
+
+        Args:
+            owner_id: ID of the user owning the invoices
+
+        Returns:
+            Estimated number of overdue invoices
+        """
+        plan = self.session.execute(
+            text(
+                f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {Invoice.__tablename__} "
+                "WHERE user_id = :owner_id AND status = :status"
+            ).bindparams(
+                bindparam('owner_id', owner_id),
+                bindparam('status', InvoiceStatus.OVERDUE, type_=Invoice.status.type)
+            )
+        ).scalar()
+
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def iter_due_for_reminder(self, owner_id: str, reminder_days: List[int],
+                              batch_size: int = 500, after_id: Optional[str] = None,
+                              now: Optional[datetime] = None) -> Iterator[Row]:
+        """
+        Stream an owner's overdue invoices whose next reminder is due.
+
+        The n-th threshold in reminder_days applies to invoices that have
+        had n reminders, so the whole reminder schedule is evaluated in SQL.
+        Each row also says which reminder is due, so callers need no
+        further checks.
+
+        Args:
+            owner_id: ID of the user owning the invoices
+            reminder_days: Days after due date for each reminder, in order
+            batch_size: Number of invoices fetched per query
+            after_id: Resume after this invoice ID
+            now: Reference time (default: current time)
+
+        Yields:
+            Rows of (Invoice, next_reminder_number), the number being 1-based
+        """
+        if not reminder_days:
+            return
+
+        query = self._due_for_reminder_query(owner_id, reminder_days, now or datetime.now())
+        yield from self._iter_keyset(query, batch_size, after_id)
+
+    def iter_due_for_reminder_pages(self, owner_id: str, reminder_days: List[int],
+                                    batch_size: int = 500, after_id: Optional[str] = None,
+                                    now: Optional[datetime] = None) -> Iterator[List[Row]]:
+        """
+        Stream an owner's invoices due for a reminder one page at a time.
+
+        Same as iter_due_for_reminder, but yields each keyset page as a list
+        so callers can commit between pages.
+
+        Args:
+            owner_id: ID of the user owning the invoices
+            reminder_days: Days after due date for each reminder, in order
+            batch_size: Number of invoices fetched per query
+            after_id: Resume after this invoice ID
+            now: Reference time (default: current time)
+
+        Yields:
+            Lists of at most batch_size (Invoice, next_reminder_number) rows
+        """
+        if not reminder_days:
+            return
+
+        query = self._due_for_reminder_query(owner_id, reminder_days, now or datetime.now())
+        yield from self._iter_keyset_pages(query, batch_size, after_id)
+
+    def claim_reminder(self, invoice_id: str, owner_id: str, reminder_days: List[int],
+                       reminder_number: int, sent_at: datetime) -> Optional[Invoice]:
+        """
+        Atomically record a reminder as sent, if it is still due.
+
+        A conditional UPDATE that only matches while the invoice awaits
+        exactly this reminder. A concurrent claim of the same reminder
+        waits for the row lock and then matches nothing, so at most one
+        caller gets the invoice back. Rolling back the transaction (e.g.
+        when the send fails) releases the claim.
+
+        Args:
+            invoice_id: ID of invoice to remind
+            owner_id: ID of the user owning the invoice
+            reminder_days: Days after due date for each reminder, in order
+            reminder_number: Which reminder is being sent (1-based)
+            sent_at: Time recorded as the reminder's send time
+
+        Returns:
+            Updated invoice if the reminder was claimed, None otherwise
+        """
+        if not reminder_days:
+            return None
+
+        return self.session.execute(
+            update(Invoice)
+            .where(
+                Invoice.id == invoice_id,
+                func.coalesce(Invoice.reminder_count, 0) == reminder_number - 1,
+                *self._due_for_reminder_criteria(owner_id, reminder_days, sent_at)
+            )
+            .values(
+                last_reminder_date=sent_at,
+                reminder_count=func.coalesce(Invoice.reminder_count, 0) + 1,
+                updated_at=sent_at
+            )
+            .returning(Invoice)
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+
+    def _iter_keyset(self, query, batch_size: int, after_id: Optional[str] = None) -> Iterator[Row]:
+        """
+        Stream the rows of an invoice select in primary key order.
+
+        Uses keyset pagination (id > last seen id), so each page is an index
+        range scan and only one page is held in memory at a time.
+
+        Args:
+            query: Select whose first entity is Invoice
+            batch_size: Number of rows fetched per query
+            after_id: Resume after this invoice ID
+
+        Yields:
+            Result rows
+        """
+        for batch in self._iter_keyset_pages(query, batch_size, after_id):
+            yield from batch
+
+    def _iter_keyset_pages(self, query, batch_size: int,
+                           after_id: Optional[str] = None) -> Iterator[List[Row]]:
+        """
+        Stream the rows of an invoice select in primary key order, page by page.
+
+        Args:
+            query: Select whose first entity is Invoice
+            batch_size: Number of rows fetched per query
+            after_id: Resume after this invoice ID
+
+        Yields:
+            Lists of at most batch_size result rows
+        """
+        last_id = after_id
+        while True:
+            page_query = query
+            if last_id is not None:
+                page_query = page_query.where(Invoice.id > last_id)
+
+            batch = self.session.execute(
+                page_query.order_by(Invoice.id).limit(batch_size)
+            ).all()
+
+            if not batch:
+                return
+
+            # Read the key before yielding; the caller may commit and expire the page
+            last_id = batch[-1][0].id
+            yield batch
+
+    def _due_for_reminder_query(self, owner_id: str, reminder_days: List[int], now: datetime):
+        """
+        Build the select for an owner's overdue invoices due for a reminder.
+
+        Args:
+            owner_id: ID of the user owning the invoices
+            reminder_days: Days after due date for each reminder, in order
+            now: Reference time
+
+        Returns:
+            Select of (Invoice, next_reminder_number) for the matching invoices
+        """
+        reminders_sent = func.coalesce(Invoice.reminder_count, 0)
+
+        return select(
+            Invoice,
+            (reminders_sent + 1).label('next_reminder_number')
+        ).where(
+            *self._due_for_reminder_criteria(owner_id, reminder_days, now)
+        )
+
+    def _due_for_reminder_criteria(self, owner_id: str, reminder_days: List[int],
+                                   now: datetime) -> list:
+        """
+        Build the WHERE criteria matching an owner's invoices due for a reminder.
+
+        Args:
+            owner_id: ID of the user owning the invoices
+            reminder_days: Days after due date for each reminder, in order
+            now: Reference time
+
+        Returns:
+            List of SQL expressions to AND together
+        """
+        reminders_sent = func.coalesce(Invoice.reminder_count, 0)
+
+        return [
+            Invoice.user_id == owner_id,
+            Invoice.status == InvoiceStatus.OVERDUE,
+            or_(*(
+                and_(reminders_sent == sent, Invoice.due_date <= now - timedelta(days=days))
+                for sent, days in enumerate(reminder_days)
+            ))
+        ]
+
+    def iter_batches_by_status(self, status: InvoiceStatus, batch_size: int = 1000,
+                               due_before: Optional[datetime] = None) -> Iterator[List[Invoice]]:
+        """
+        Iterate over all invoices with a status in primary key order, in batches.
+
+        Uses the same keyset pagination as _iter_keyset, so each batch is an
+        index range scan and only one batch is held in memory at a time.
+
+        Args:
+            status: Status to filter by
+            batch_size: Maximum number of invoices per batch
+            due_before: Only include invoices due before this time (optional)
+
+        Yields:
+            Lists of at most batch_size invoices
+        """
+        query = select(Invoice).where(Invoice.status == status)
+        if due_before is not None:
+            query = query.where(Invoice.due_date < due_before)
+
+        for page in self._iter_keyset_pages(query, batch_size):
+            yield [row[0] for row in page]
+
     def record_reminder_sent(self, invoice_id: int) -> Optional[Invoice]:
         """
         Record that a reminder was sent for an invoice.
@@ -177,13 +449,39 @@ class InvoiceRepository(BaseRepository[Invoice]):
         """
         invoice = self.get_by_id(invoice_id)
         if invoice and invoice.status in [InvoiceStatus.SENT, InvoiceStatus.REMINDER_SENT]:
+            now = datetime.now()
             invoice.status = InvoiceStatus.REMINDER_SENT
-            invoice.last_reminder_date = datetime.now()
+            invoice.last_reminder_date = now
             invoice.reminder_count = (invoice.reminder_count or 0) + 1
-            invoice.updated_at = datetime.now()
+            invoice.updated_at = now
             return invoice
         return None
 
+    def bulk_record_reminder_sent(self, sent: List[Tuple[str, datetime]]) -> None:
+        """
+        Record reminders sent for many invoices in a single UPDATE.
+
+        Args:
+            sent: List of (invoice_id, sent_at) pairs
+        """
+        if not sent:
+            return
+
+        data = values(
+            column('id', String), column('sent_at', DateTime), name='data'
+        ).data(sent)
+
+        self.session.execute(
+            update(Invoice)
+            .where(Invoice.id == data.c.id)
+            .values(
+                last_reminder_date=data.c.sent_at,
+                reminder_count=func.coalesce(Invoice.reminder_count, 0) + 1,
+                updated_at=data.c.sent_at
+            )
+            .execution_options(synchronize_session=False)
+        )
+
     def get_invoice_with_customer(self, invoice_id: int) -> Optional[Invoice]:
         """
         Get invoice with customer data preloaded.
@@ -200,6 +498,41 @@ class InvoiceRepository(BaseRepository[Invoice]):
             Invoice.id == invoice_id
         ).first()
 
+    def list_invoice_summaries(self, filters: Optional[Dict[str, Any]] = None,
+                               skip: int = 0, limit: int = 100) -> List[Row]:
+        """
+        List invoices as lightweight rows for index pages and JSON listings.
+
+        Only the columns a listing shows are selected and no ORM instances are
+        built, so use get_by_id when the invoice is going to be modified.
+
+        Args:
+            filters: Optional column filters as a dictionary
+            skip: Pagination offset
+            limit: Pagination limit
+
+        Returns:
+            List of rows with id, invoice_number, total, status, due_date
+            and customer_name
+        """
+        query = select(
+            Invoice.id,
+            Invoice.invoice_number,
+            Invoice.total,
+            Invoice.status,
+            Invoice.due_date,
+            Customer.name.label('customer_name')
+        ).join(Customer, Invoice.customer_id == Customer.id)
+
+        # Apply filters
+        for key, value in (filters or {}).items():
+            if hasattr(Invoice, key):
+                query = query.where(getattr(Invoice, key) == value)
+
+        query = query.order_by(desc(Invoice.created_at)).offset(skip).limit(limit)
+
+        return self.session.execute(query).all()
+
     def get_invoices_by_status(self, user_id: int, status: InvoiceStatus,
                                skip: int = 0, limit: int = 100) -> List[Invoice]:
         """
@@ -284,11 +617,11 @@ class InvoiceRepository(BaseRepository[Invoice]):
             'vat_amount': invoice.vat_amount,
             'total': invoice.total,
             'status': invoice.status.value,
-            'created_at': invoice.created_at.isoformat() if invoice.created_at else None,
-            'updated_at': invoice.updated_at.isoformat() if invoice.updated_at else None,
-            'sent_date': invoice.sent_date.isoformat() if invoice.sent_date else None,
-            'payment_date': invoice.payment_date.isoformat() if invoice.payment_date else None,
-            'due_date': invoice.due_date.isoformat() if invoice.due_date else None,
-            'last_reminder_date': invoice.last_reminder_date.isoformat() if invoice.last_reminder_date else None,
+            'created_at': isoformat_or_none(invoice.created_at),
+            'updated_at': isoformat_or_none(invoice.updated_at),
+            'sent_date': isoformat_or_none(invoice.sent_date),
+            'payment_date': isoformat_or_none(invoice.payment_date),
+            'due_date': isoformat_or_none(invoice.due_date),
+            'last_reminder_date': isoformat_or_none(invoice.last_reminder_date),
             'reminder_count': invoice.reminder_count or 0,
         }
\ No newline at end of file
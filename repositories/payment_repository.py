@@ -6,12 +6,29 @@ This module contains the repository class for payment-related data access operat
 from datetime import datetime
 from typing import List, Optional, Dict, Any, Tuple
 
-from sqlalchemy import and_, desc, func
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Row, RowMapping, String, and_, case, cast, desc, func, insert, literal, select, update
+from sqlalchemy.orm import Session, aliased, joinedload
 
+from app.models.customer import Customer
 from app.models.payment import Payment, PaymentMethod, PaymentStatus
-from app.models.invoice import Invoice
-from app.repositories.base_repository import BaseRepository
+from app.models.invoice import Invoice, InvoiceStatus
+from app.models.user import User
+from app.repositories.base_repository import BaseRepository, isoformat_or_none
+from app.repositories.invoice_repository import InvoiceRepository
+
+
+# Invoice statuses a payment can be recorded against
+PAYABLE_STATUSES = (
+    InvoiceStatus.SENT,
+    InvoiceStatus.REMINDER_SENT,
+    InvoiceStatus.OVERDUE,
+    InvoiceStatus.PARTIALLY_PAID
+)
+
+
+def _isoformat(column):
+    """Format a timestamp column in SQL the way datetime.isoformat() does."""
+    return func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS.US')
 
 
 class PaymentRepository(BaseRepository[Payment]):
@@ -35,21 +52,19 @@ class PaymentRepository(BaseRepository[Payment]):
             invoice_id: ID of invoice being paid
             amount: Payment amount
             payment_method: Method of payment
-            payment_date: Date of payment (default: now)
+            payment_date: Date of payment, in UTC (default: now)
             reference: Payment reference/transaction number
             notes: Additional payment notes
 
         Returns:
             Tuple of (payment, updated_invoice)
         """
-        from app.repositories.invoice_repository import InvoiceRepository
-
         # Create payment record
         payment = self.create(
             invoice_id=invoice_id,
             amount=amount,
             payment_method=payment_method,
-            payment_date=payment_date or datetime.now(),
+            payment_date=payment_date or datetime.utcnow(),
             reference=reference,
             notes=notes,
             status=PaymentStatus.COMPLETED
@@ -61,6 +76,137 @@ class PaymentRepository(BaseRepository[Payment]):
 
         return payment, invoice
 
+    def record_payment_atomic(self, invoice_id: int, amount: float,
+                              payment_method: PaymentMethod = PaymentMethod.OTHER,
+                              payment_date: datetime = None,
+                              reference: str = None,
+                              notes: str = None) -> Optional[Tuple[Payment, Invoice]]:
+        """
+        Record a payment and apply it to its invoice in a single statement.
+
+        The payment INSERT and the invoice UPDATE run as data-modifying CTEs
+        of one query, so there is no window between validating the invoice
+        and updating its balance, and only one round trip is made.
+
+        Args:
+            invoice_id: ID of invoice being paid
+            amount: Payment amount
+            payment_method: Method of payment
+            payment_date: Date of payment, in UTC (default: now)
+            reference: Payment reference/transaction number
+            notes: Additional payment notes
+
+        Returns:
+            Tuple of (payment, updated_invoice), or None if the invoice
+            does not exist or is not in a payable status; nothing is
+            written in that case
+        """
+        payment_date = payment_date or datetime.utcnow()
+
+        # Insert the payment only if the invoice exists and can be paid
+        inserted = insert(Payment).from_select(
+            ['invoice_id', 'amount', 'payment_method', 'payment_date',
+             'reference', 'notes', 'status', 'is_refund'],
+            select(
+                Invoice.id,
+                literal(amount),
+                literal(payment_method, Payment.payment_method.type),
+                literal(payment_date),
+                literal(reference, Payment.reference.type),
+                literal(notes, Payment.notes.type),
+                literal(PaymentStatus.COMPLETED, Payment.status.type),
+                literal(False)
+            ).where(
+                Invoice.id == invoice_id,
+                Invoice.status.in_(PAYABLE_STATUSES)
+            )
+        ).returning(*Payment.__table__.c).cte('inserted_payment')
+
+        # Apply it to the invoice balance and status
+        amount_paid = Invoice.amount_paid + amount
+        paid_in_full = amount_paid >= Invoice.total
+        updated = update(Invoice).where(
+            Invoice.id.in_(select(inserted.c.invoice_id)),
+            Invoice.status.in_(PAYABLE_STATUSES)
+        ).values(
+            amount_paid=amount_paid,
+            status=case(
+                (paid_in_full, literal(InvoiceStatus.PAID, Invoice.status.type)),
+                else_=literal(InvoiceStatus.PARTIALLY_PAID, Invoice.status.type)
+            ),
+            payment_date=case((paid_in_full, payment_date), else_=Invoice.payment_date),
+            updated_at=func.now()
+        ).returning(*Invoice.__table__.c).cte('updated_invoice')
+
+        row = self.session.execute(
+            select(
+                aliased(Payment, inserted, adapt_on_names=True),
+                aliased(Invoice, updated, adapt_on_names=True)
+            ).execution_options(populate_existing=True)
+        ).first()
+
+        return (row[0], row[1]) if row else None
+
+    def get_with_invoice(self, payment_id: int) -> Optional[Payment]:
+        """
+        Get a payment with its invoice loaded in the same query.
+
+        Args:
+            payment_id: ID of payment
+
+        Returns:
+            Payment with invoice loaded, or None if not found
+        """
+        return self.session.query(Payment).options(
+            joinedload(Payment.invoice)
+        ).filter(
+            Payment.id == payment_id
+        ).first()
+
+    def get_receipt_row(self, payment_id: int) -> Optional[Payment]:
+        """
+        Get a payment with everything a receipt needs loaded in one query.
+
+        Args:
+            payment_id: ID of payment
+
+        Returns:
+            Payment with invoice, invoice customer and invoice user loaded,
+            or None if not found
+        """
+        return self.session.query(Payment).options(
+            joinedload(Payment.invoice).joinedload(Invoice.customer),
+            joinedload(Payment.invoice).joinedload(Invoice.user)
+        ).filter(
+            Payment.id == payment_id
+        ).first()
+
+    def get_receipt_version(self, payment_id: int) -> Optional[Row]:
+        """
+        Get the updated_at timestamps of everything a receipt shows, e.g. to
+        validate a cached receipt.
+
+        Args:
+            payment_id: ID of payment
+
+        Returns:
+            Row with updated_at, customer_updated_at and user_updated_at,
+            or None if the payment does not exist
+        """
+        return self.session.execute(
+            select(
+                Payment.updated_at,
+                Customer.updated_at.label('customer_updated_at'),
+                User.updated_at.label('user_updated_at')
+            ).outerjoin(
+                Invoice, Payment.invoice_id == Invoice.id
+            ).outerjoin(
+                Customer, Invoice.customer_id == Customer.id
+            ).outerjoin(
+                User, Invoice.user_id == User.id
+            ).where(Payment.id == payment_id)
+        ).first()
+
     def get_payments_for_invoice(self, invoice_id: int) -> List[Payment]:
         """
         Get all payments for an invoice.
@@ -75,6 +221,39 @@ class PaymentRepository(BaseRepository[Payment]):
             Payment.invoice_id == invoice_id
         ).order_by(desc(Payment.payment_date)).all()
 
+    def get_payment_dicts(self, invoice_id: int) -> List[RowMapping]:
+        """
+        Get all payments for an invoice, already shaped like to_dict.
+
+        The columns are selected and formatted in SQL and returned as
+        mappings, so no Payment instances are built for read-only listings.
+
+        Args:
+            invoice_id: ID of invoice
+
+        Returns:
+            List of mappings with the same keys as to_dict
+        """
+        payments = Payment.__table__.c
+
+        return self.session.execute(
+            select(
+                payments.id,
+                payments.uuid,
+                payments.invoice_id,
+                payments.amount,
+                func.lower(cast(payments.payment_method, String)).label('payment_method'),
+                _isoformat(payments.payment_date).label('payment_date'),
+                payments.reference,
+                payments.notes,
+                func.lower(cast(payments.status, String)).label('status'),
+                _isoformat(payments.created_at).label('created_at'),
+                _isoformat(payments.updated_at).label('updated_at'),
+            ).where(
+                payments.invoice_id == invoice_id
+            ).order_by(desc(payments.payment_date))
+        ).mappings().all()
+
     def get_recent_payments(self, user_id: int, limit: int = 10) -> List[Payment]:
         """
         Get recent payments for a user.
@@ -155,10 +334,10 @@ class PaymentRepository(BaseRepository[Payment]):
             'invoice_id': payment.invoice_id,
             'amount': payment.amount,
             'payment_method': payment.payment_method.value,
-            'payment_date': payment.payment_date.isoformat() if payment.payment_date else None,
+            'payment_date': isoformat_or_none(payment.payment_date),
             'reference': payment.reference,
             'notes': payment.notes,
             'status': payment.status.value,
-            'created_at': payment.created_at.isoformat() if payment.created_at else None,
-            'updated_at': payment.updated_at.isoformat() if payment.updated_at else None,
+            'created_at': isoformat_or_none(payment.created_at),
+            'updated_at': isoformat_or_none(payment.updated_at),
         }
\ No newline at end of file
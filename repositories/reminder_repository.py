@@ -6,12 +6,13 @@ This module contains the repository class for reminder-related data access opera
 from datetime import datetime
 from typing import List, Optional, Dict, Any, Tuple
 
-from sqlalchemy import and_, or_, desc, func
+from sqlalchemy import Row, and_, or_, desc, func, select, update
 from sqlalchemy.orm import Session, joinedload
 
 from app.models.reminder import Reminder, ReminderStatus
-from app.models.invoice import Invoice
-from app.repositories.base_repository import BaseRepository
+from app.models.invoice import Invoice, InvoiceStatus
+from app.repositories.base_repository import BaseRepository, isoformat_or_none
+from app.repositories.invoice_repository import InvoiceRepository
 
 
 class ReminderRepository(BaseRepository[Reminder]):
@@ -39,7 +40,7 @@ class ReminderRepository(BaseRepository[Reminder]):
             Created reminder instance
         """
         # Get invoice to verify it exists
-        invoice = self.session.query(Invoice).get(invoice_id)
+        invoice = self.session.get(Invoice, invoice_id)
         if not invoice:
             raise ValueError(f"Invoice with ID {invoice_id} not found")
 
@@ -71,6 +72,32 @@ class ReminderRepository(BaseRepository[Reminder]):
             Reminder.scheduled_date
         ).all()
 
+    def claim_due_reminders(self, limit: int = 100) -> List[Reminder]:
+        """
+        Claim a batch of due reminders for this worker.
+
+        The rows are locked with FOR UPDATE SKIP LOCKED, so concurrent workers
+        each receive a disjoint batch instead of racing on the same reminders.
+        The locks are held until the current transaction ends; mark the batch
+        with mark_many_as_sent / mark_as_failed before committing.
+
+        Args:
+            limit: Maximum number of reminders to claim
+
+        Returns:
+            List of claimed reminders, oldest scheduled first
+        """
+        now = datetime.now()
+
+        return self.session.execute(
+            select(Reminder).where(
+                Reminder.status == ReminderStatus.SCHEDULED,
+                Reminder.scheduled_date <= now
+            ).order_by(
+                Reminder.scheduled_date
+            ).limit(limit).with_for_update(skip_locked=True)
+        ).scalars().all()
+
     def mark_as_sent(self, reminder_id: int, sent_date: datetime = None) -> Optional[Reminder]:
         """
         Mark a reminder as sent.
@@ -84,18 +111,66 @@ class ReminderRepository(BaseRepository[Reminder]):
         """
         reminder = self.get_by_id(reminder_id)
         if reminder and reminder.status == ReminderStatus.SCHEDULED:
+            now = datetime.now()
             reminder.status = ReminderStatus.SENT
-            reminder.sent_date = sent_date or datetime.now()
-            reminder.updated_at = datetime.now()
+            reminder.sent_date = sent_date or now
+            reminder.updated_at = now
 
             # Update the invoice's last reminder date
-            from app.repositories.invoice_repository import InvoiceRepository
             invoice_repo = InvoiceRepository(self.session)
             invoice_repo.record_reminder_sent(reminder.invoice_id)
 
             return reminder
         return None
 
+    def mark_many_as_sent(self, reminder_ids: List[int]) -> List[int]:
+        """
+        Mark a batch of scheduled reminders as sent.
+
+        Both the reminders and their invoices are updated with one statement
+        each, so the cost of a scheduler tick does not grow with the number of
+        due reminders.
+
+        Args:
+            reminder_ids: IDs of reminders that were sent
+
+        Returns:
+            IDs of invoices whose reminder was marked as sent
+        """
+        if not reminder_ids:
+            return []
+
+        now = func.now()
+
+        invoice_ids = self.session.execute(
+            update(Reminder)
+            .where(
+                Reminder.id.in_(reminder_ids),
+                Reminder.status == ReminderStatus.SCHEDULED
+            )
+            .values(status=ReminderStatus.SENT, sent_date=now, updated_at=now)
+            .returning(Reminder.invoice_id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+
+        if invoice_ids:
+            self.session.execute(
+                update(Invoice)
+                .where(
+                    Invoice.id.in_(set(invoice_ids)),
+                    Invoice.status.in_([InvoiceStatus.SENT, InvoiceStatus.REMINDER_SENT])
+                )
+                .values(
+                    status=InvoiceStatus.REMINDER_SENT,
+                    last_reminder_date=now,
+                    reminder_count=func.coalesce(Invoice.reminder_count, 0) + 1,
+                    updated_at=now
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+        return invoice_ids
+
     def mark_as_failed(self, reminder_id: int, error_message: str) -> Optional[Reminder]:
         """
         Mark a reminder as failed.
@@ -129,6 +204,27 @@ class ReminderRepository(BaseRepository[Reminder]):
             Reminder.invoice_id == invoice_id
         ).order_by(desc(Reminder.scheduled_date)).all()
 
+    def get_reminder_summaries_for_invoice(self, invoice_id: int) -> List[Row]:
+        """
+        Get lightweight reminder rows for an invoice, for listings.
+
+        Args:
+            invoice_id: ID of invoice
+
+        Returns:
+            List of rows with id, scheduled_date, sent_date and status
+        """
+        return self.session.execute(
+            select(
+                Reminder.id,
+                Reminder.scheduled_date,
+                Reminder.sent_date,
+                Reminder.status
+            ).where(
+                Reminder.invoice_id == invoice_id
+            ).order_by(desc(Reminder.scheduled_date))
+        ).all()
+
     def get_reminder_with_details(self, reminder_id: int) -> Optional[Reminder]:
         """
         Get a reminder with invoice and customer details loaded.
@@ -160,7 +256,7 @@ class ReminderRepository(BaseRepository[Reminder]):
         Returns:
             List of created reminders
         """
-        invoice = self.session.query(Invoice).get(invoice_id)
+        invoice = self.session.get(Invoice, invoice_id)
         if not invoice or not invoice.due_date:
             raise ValueError("Invoice not found or missing due date")
 
@@ -199,10 +295,10 @@ class ReminderRepository(BaseRepository[Reminder]):
             'customer_id': reminder.customer_id,
             'template_id': reminder.template_id,
             'custom_message': reminder.custom_message,
-            'scheduled_date': reminder.scheduled_date.isoformat() if reminder.scheduled_date else None,
-            'sent_date': reminder.sent_date.isoformat() if reminder.sent_date else None,
+            'scheduled_date': isoformat_or_none(reminder.scheduled_date),
+            'sent_date': isoformat_or_none(reminder.sent_date),
             'status': reminder.status.value,
             'error_message': reminder.error_message,
-            'created_at': reminder.created_at.isoformat() if reminder.created_at else None,
-            'updated_at': reminder.updated_at.isoformat() if reminder.updated_at else None,
+            'created_at': isoformat_or_none(reminder.created_at),
+            'updated_at': isoformat_or_none(reminder.updated_at),
         }
\ No newline at end of file
@@ -10,7 +10,7 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.models.user import User
-from app.repositories.base_repository import BaseRepository
+from app.repositories.base_repository import BaseRepository, isoformat_or_none
 
 
 class UserRepository(BaseRepository[User]):
@@ -157,14 +157,14 @@ class UserRepository(BaseRepository[User]):
             'email': user.email,
             'name': user.name,
             'company_name': user.company_name,
-            'created_at': user.created_at.isoformat() if user.created_at else None,
-            'updated_at': user.updated_at.isoformat() if user.updated_at else None,
+            'created_at': isoformat_or_none(user.created_at),
+            'updated_at': isoformat_or_none(user.updated_at),
         }
 
         if include_private:
             result.update({
                 'settings': user.settings,
-                'last_login': user.last_login.isoformat() if user.last_login else None
+                'last_login': isoformat_or_none(user.last_login)
             })
 
         return result
\ No newline at end of file
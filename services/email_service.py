@@ -7,10 +7,11 @@ sending emails, including invoices and payment reminders.
 import logging
 import smtplib
 import ssl
+from contextlib import contextmanager
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
-from typing import List, Dict, Any, Optional
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 
 from invoice_app.config.settings import get_settings
 
@@ -18,6 +19,10 @@ from invoice_app.config.settings import get_settings
 logger = logging.getLogger(__name__)
 
 
+class EmailDeliveryError(Exception):
+    """Raised when an email could not be sent and should be retried."""
+
+
 class EmailService:
     """Service for sending emails."""
 
@@ -52,7 +57,9 @@ class EmailService:
                    cc: List[str] = None, bcc: List[str] = None,
                    attachments: List[Dict[str, Any]] = None) -> bool:
         """
-        Send an email.
+        Send an email over a connection of its own.
+
+        Use open_session instead when sending many emails in a row.
 
         Args:
             to_email: Recipient email address.
@@ -61,62 +68,102 @@ class EmailService:
             cc: Optional list of CC recipients.
             bcc: Optional list of BCC recipients.
             attachments: Optional list of attachments. Each attachment is a dict
-                        with 'filename', 'content', and 'content_type' keys.
+                        with 'filename', 'content' (bytes), and 'content_type' keys.
 
         Returns:
             True if email was sent successfully, False otherwise.
         """
+        with self.open_session() as session:
+            return session.send(to_email, subject, message, cc=cc, bcc=bcc, attachments=attachments)
+
+    @contextmanager
+    def open_session(self) -> Iterator['EmailSession']:
+        """
+        Open an SMTP session for sending several emails on one connection.
+
+        The connection is opened on the first send and closed on exit.
+
+        Yields:
+            EmailSession bound to this service's configuration.
+        """
+        session = EmailSession(self)
         try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.config['from_email']
-            msg['To'] = to_email
-            msg['Subject'] = subject
-
-            # Add CC and BCC if provided
-            if cc:
-                msg['Cc'] = ', '.join(cc)
-
-            if bcc:
-                msg['Bcc'] = ', '.join(bcc)
-
-            # Add message body
-            msg.attach(MIMEText(message, 'plain'))
-
-            # Add attachments if provided
-            if attachments:
-                for attachment in attachments:
-                    if all(k in attachment for k in ['filename', 'content', 'content_type']):
-                        part = MIMEApplication(attachment['content'])
-                        part.add_header('Content-Disposition', 'attachment',
-                                        filename=attachment['filename'])
-                        msg.attach(part)
-
-            # Build recipient list
-            recipients = [to_email]
-            if cc:
-                recipients.extend(cc)
-            if bcc:
-                recipients.extend(bcc)
-
-            # Connect to SMTP server and send email
-            with smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port']) as server:
-                # Secure the connection
-                context = ssl.create_default_context()
-                server.starttls(context=context)
-
-                # Login
-                server.login(self.config['smtp_username'], self.config['smtp_password'])
-
-                # Send email
-                server.sendmail(self.config['from_email'], recipients, msg.as_string())
-
-            logger.info(f"Email sent to {to_email}: {subject}")
-            return True
+            yield session
+        finally:
+            session.close()
 
-        except Exception as e:
-            logger.error(f"Error sending email to {to_email}: {str(e)}")
-            return False
+    def _connect(self) -> smtplib.SMTP:
+        """
+        Open an authenticated SMTP connection.
+
+        Returns:
+            Connected SMTP client, secured with STARTTLS and logged in.
+        """
+        server = smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port'])
+        try:
+            # Secure the connection
+            context = ssl.create_default_context()
+            server.starttls(context=context)
+
+            # Login
+            server.login(self.config['smtp_username'], self.config['smtp_password'])
+        except Exception:
+            server.close()
+            raise
+
+        return server
+
+    def _build_message(self, to_email: str, subject: str, message: str,
+                       cc: List[str] = None, bcc: List[str] = None,
+                       attachments: List[Dict[str, Any]] = None) -> Tuple[MIMEMultipart, List[str]]:
+        """
+        Build an email message and its recipient list.
+
+        Args:
+            to_email: Recipient email address.
+            subject: Email subject.
+            message: Email body text.
+            cc: Optional list of CC recipients.
+            bcc: Optional list of BCC recipients.
+            attachments: Optional list of attachments, as for send_email.
+
+        Returns:
+            Tuple of (message, recipients).
+        """
+        # Create message
+        msg = MIMEMultipart()
+        msg['From'] = self.config['from_email']
+        msg['To'] = to_email
+        msg['Subject'] = subject
+
+        # Add CC and BCC if provided
+        if cc:
+            msg['Cc'] = ', '.join(cc)
+
+        if bcc:
+            msg['Bcc'] = ', '.join(bcc)
+
+        # Add message body
+        msg.attach(MIMEText(message, 'plain'))
+
+        # Add attachments if provided
+        if attachments:
+            for attachment in attachments:
+                if all(k in attachment for k in ['filename', 'content', 'content_type']):
+                    subtype = attachment['content_type'].split('/')[-1]
+                    part = MIMEApplication(attachment['content'], _subtype=subtype)
+                    part.add_header('Content-Disposition', 'attachment',
+                                    filename=attachment['filename'])
+                    msg.attach(part)
+
+        # Build recipient list
+        recipients = [to_email]
+        if cc:
+            recipients.extend(cc)
+        if bcc:
+            recipients.extend(bcc)
+
+        return msg, recipients
 
     def send_test_email(self, to_email: str) -> bool:
         """
@@ -138,4 +185,89 @@ Best regards,
 Invoice App
         """
 
-        return self.send_email(to_email, subject, message)
\ No newline at end of file
+        return self.send_email(to_email, subject, message)
+
+
+class EmailSession:
+    """
+    SMTP session that sends several emails over one connection.
+
+    Obtain one from EmailService.open_session. If the server drops the
+    connection between messages, the session reconnects and retries once
+    instead of failing the rest of the batch.
+    """
+
+    def __init__(self, email_service: EmailService):
+        """
+        Initialize the session.
+
+        Args:
+            email_service: Service providing configuration and connections.
+        """
+        self.email_service = email_service
+        self._server: Optional[smtplib.SMTP] = None
+
+    def send(self, to_email: str, subject: str, message: str,
+             cc: List[str] = None, bcc: List[str] = None,
+             attachments: List[Dict[str, Any]] = None) -> bool:
+        """
+        Send an email on the session's connection.
+
+        Args:
+            to_email: Recipient email address.
+            subject: Email subject.
+            message: Email body text.
+            cc: Optional list of CC recipients.
+            bcc: Optional list of BCC recipients.
+            attachments: Optional list of attachments, as for send_email.
+
+        Returns:
+            True if email was sent successfully, False otherwise.
+        """
+        config = self.email_service.config
+
+        try:
+            msg, recipients = self.email_service._build_message(
+                to_email, subject, message, cc=cc, bcc=bcc, attachments=attachments
+            )
+
+            try:
+                self._send(msg, recipients)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                # Connection went stale; reconnect and retry once
+                logger.warning("SMTP connection lost, reconnecting to %s", config['smtp_server'])
+                self.close()
+                self._send(msg, recipients)
+
+            logger.debug("Email sent to %s: %s", to_email, subject)
+            return True
+
+        except Exception as e:
+            logger.error("Error sending email to %s: %s", to_email, e)
+            return False
+
+    def close(self) -> None:
+        """Close the connection, if one is open."""
+        if self._server is None:
+            return
+
+        server, self._server = self._server, None
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def _send(self, msg: MIMEMultipart, recipients: List[str]) -> None:
+        """
+        Send a built message, connecting first if needed.
+
+        Args:
+            msg: Message to send.
+            recipients: Envelope recipients.
+        """
+        if self._server is None:
+            self._server = self.email_service._connect()
+
+        # Send email (serialized straight to bytes, Bcc header is stripped)
+        self._server.send_message(msg, from_addr=self.email_service.config['from_email'],
+                                  to_addrs=recipients)
@@ -6,7 +6,7 @@ business logic for creating, updating, sending, and managing invoices.
 """
 import logging
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+from typing import BinaryIO, List, Dict, Any, Optional, Tuple
 
 from invoice_app.models.invoice import Invoice, InvoiceStatus
 from invoice_app.models.invoice_item import InvoiceItem
@@ -167,6 +167,18 @@ class InvoiceService:
         """
         return self.invoice_repository.list(filters)
 
+    def list_invoice_summaries(self, filters: Dict[str, Any] = None) -> List[Tuple]:
+        """
+        List invoice summary rows for display, optionally filtered.
+
+        Args:
+            filters: Optional filters for the invoices.
+
+        Returns:
+            List of (id, invoice_number, total, status, due_date, customer_name) rows.
+        """
+        return self.invoice_repository.list_invoice_summaries(filters)
+
     def send_invoice(self, invoice_id: str, subject: str = None,
                      message: str = None) -> bool:
         """
@@ -193,9 +205,6 @@ class InvoiceService:
             raise ValueError(f"Invoice {invoice.invoice_number} cannot be sent in its current state")
 
         try:
-            # Generate PDF
-            pdf_bytes = self.pdf_service.generate_invoice_pdf(invoice)
-
             # Default subject if not provided
             if not subject:
                 subject = f"Invoice {invoice.invoice_number} from Your Business"
@@ -215,6 +224,9 @@ Best regards,
 Your Business
                 """
 
+            # Generate PDF
+            pdf_bytes = self.pdf_service.generate_invoice_pdf(invoice)
+
             # Send email
             email_sent = self.email_service.send_email(
                 to_email=invoice.customer_email,
@@ -275,38 +287,52 @@ Your Business
             logger.error(f"Error marking invoice {invoice.invoice_number} as paid: {str(e)}")
             return False
 
-    def check_overdue_invoices(self) -> List[Invoice]:
+    def check_overdue_invoices(self) -> List[str]:
         """
         Check for invoices that have become overdue.
 
+        Invoices are checked a batch at a time, and each batch is flushed
+        and released afterwards, so memory stays bounded by one batch.
+        Changes are flushed but not committed; the caller owns the
+        transaction.
+
         Returns:
-            List of newly overdue invoices.
+            IDs of newly overdue invoices.
         """
-        # Get sent invoices
-        sent_invoices = self.invoice_repository.list({
-            'status': InvoiceStatus.SENT.value
-        })
-
+        session = self.invoice_repository.session
         newly_overdue = []
-        for invoice in sent_invoices:
-            # Check if overdue
-            if invoice.check_overdue():
-                # Save updated status
-                self.invoice_repository.save(invoice)
-                newly_overdue.append(invoice)
-                logger.info(f"Invoice {invoice.invoice_number} marked as overdue")
+
+        # Walk sent invoices past their due date a batch at a time, to keep memory bounded
+        for batch in self.invoice_repository.iter_batches_by_status(InvoiceStatus.SENT,
+                                                                    due_before=datetime.now()):
+            for invoice in batch:
+                # Check if overdue
+                if invoice.check_overdue():
+                    # Save updated status
+                    self.invoice_repository.save(invoice)
+                    newly_overdue.append(invoice.id)
+                    logger.info(f"Invoice {invoice.invoice_number} marked as overdue")
+
+            # Write the batch, then drop its invoices from the session
+            session.flush()
+            for invoice in batch:
+                session.expunge(invoice)
 
         return newly_overdue
 
-    def generate_invoice_pdf(self, invoice_id: str) -> Optional[bytes]:
+    def generate_invoice_pdf(self, invoice_id: str,
+                             out: Optional[BinaryIO] = None) -> Optional[bytes]:
         """
         Generate a PDF for an invoice.
 
         Args:
             invoice_id: ID of the invoice to generate PDF for.
+            out: Optional writable binary stream to write the PDF to
+                 instead of returning it.
 
         Returns:
-            PDF bytes if generated successfully, None otherwise.
+            PDF bytes if generated successfully and out is not given,
+            None otherwise.
 
         Raises:
             ValueError: If invoice not found.
@@ -318,8 +344,7 @@ Your Business
 
         try:
             # Generate PDF
-            pdf_bytes = self.pdf_service.generate_invoice_pdf(invoice)
-            return pdf_bytes
+            return self.pdf_service.generate_invoice_pdf(invoice, out)
 
         except Exception as e:
             logger.error(f"Error generating PDF for invoice {invoice.invoice_number}: {str(e)}")
@@ -3,6 +3,9 @@ Payment service module.
 
 This module contains the service class for payment-related business logic.
 """
+import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from typing import List, Optional, Dict, Any, Tuple
 
@@ -12,7 +15,21 @@ from app.models.payment import Payment, PaymentMethod, PaymentStatus
 from app.models.invoice import Invoice, InvoiceStatus
 from app.repositories.payment_repository import PaymentRepository
 from app.repositories.invoice_repository import InvoiceRepository
-from app.services.email_service import EmailService
+from app.db.base import run_after_commit
+from app.services.email_service import EmailDeliveryError, EmailService
+from app.tasks.email_tasks import send_payment_receipt_task, send_refund_notification_task
+
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of receipts kept by _receipt_cache
+RECEIPT_CACHE_SIZE = 4096
+
+# Receipts keyed by (payment_id, updated_at, customer_updated_at,
+# user_updated_at), least recently used first. A change to the payment,
+# the customer or the company gets a new key and so a new entry.
+_receipt_cache: "OrderedDict[Tuple[int, Optional[datetime], ...], Dict[str, Any]]" = OrderedDict()
+_receipt_cache_lock = threading.Lock()
 
 
 class PaymentService:
@@ -52,13 +69,15 @@ class PaymentService:
         Record a payment for an invoice and perform related actions.
 
         This method records the payment, updates the invoice status,
-        and optionally sends a receipt email to the customer.
+        and optionally sends a receipt email to the customer. Changes are
+        flushed but not committed; the caller owns the transaction and the
+        receipt is queued once it commits.
 
         Args:
             invoice_id: ID of invoice being paid
             amount: Payment amount
             payment_method: Method of payment
-            payment_date: Date of payment (default: now)
+            payment_date: Date of payment, in UTC (default: now)
             reference: Payment reference/transaction number
             notes: Additional payment notes
             send_receipt: Whether to send receipt email
@@ -69,53 +88,50 @@ class PaymentService:
         Raises:
             ValueError: If payment validation fails
         """
-        # Get the invoice to validate it exists and has remaining balance
-        invoice = self.invoice_repo.get_by_id(invoice_id)
-        if not invoice:
-            raise ValueError(f"Invoice with ID {invoice_id} not found")
-
         # Validate payment amount
         if amount <= 0:
             raise ValueError("Payment amount must be positive")
 
-        # Check if this would overpay the invoice
-        if amount > invoice.total - invoice.amount_paid:
+        # Record the payment and update the invoice in one statement
+        result = self.payment_repo.record_payment_atomic(
+            invoice_id=invoice_id,
+            amount=amount,
+            payment_method=payment_method,
+            payment_date=payment_date,
+            reference=reference,
+            notes=notes
+        )
+        if not result:
+            invoice = self.invoice_repo.get_by_id(invoice_id)
+            if not invoice:
+                raise ValueError(f"Invoice with ID {invoice_id} not found")
+            raise ValueError(f"Cannot record payment for invoice with status {invoice.status.value}")
+
+        payment, updated_invoice = result
+
+        # Check if this overpaid the invoice
+        if updated_invoice.amount_paid > updated_invoice.total:
             # Handle potential overpayment (could implement business logic here)
             # For now, just log a warning but allow it
-            print(f"Warning: Payment amount {amount} exceeds remaining balance "
-                  f"{invoice.total - invoice.amount_paid} for invoice {invoice_id}")
-
-        # Start a transaction
-        try:
-            # Record the payment
-            payment, updated_invoice = self.payment_repo.record_payment(
-                invoice_id=invoice_id,
-                amount=amount,
-                payment_method=payment_method,
-                payment_date=payment_date,
-                reference=reference,
-                notes=notes
+            logger.warning(
+                "Payment amount %.2f exceeds remaining balance %.2f for invoice %d",
+                amount, updated_invoice.total - (updated_invoice.amount_paid - amount), invoice_id
             )
 
-            # Send receipt email if requested
-            if send_receipt and updated_invoice.status == InvoiceStatus.PAID:
-                self._send_payment_receipt(payment, updated_invoice)
-
-            # Commit the transaction
-            self.session.commit()
-
-            return payment, updated_invoice
+        # Queue receipt email once the caller's transaction commits
+        if send_receipt and updated_invoice.status == InvoiceStatus.PAID:
+            run_after_commit(self.session, lambda: self._send_payment_receipt(payment, updated_invoice))
 
-        except Exception as e:
-            # Rollback in case of error
-            self.session.rollback()
-            raise
+        return payment, updated_invoice
 
     def process_refund(self, payment_id: int, refund_amount: Optional[float] = None,
                        refund_reason: str = "", send_notification: bool = True) -> Tuple[Payment, Invoice]:
         """
         Process a refund for a payment.
 
+        Changes are flushed but not committed; the caller owns the
+        transaction and the notification is queued once it commits.
+
         Args:
             payment_id: ID of payment to refund
             refund_amount: Amount to refund (default: full payment amount)
@@ -128,11 +144,14 @@ class PaymentService:
         Raises:
             ValueError: If refund validation fails
         """
-        # Get the original payment
-        original_payment = self.payment_repo.get_by_id(payment_id)
+        # Get the original payment together with its invoice
+        original_payment = self.payment_repo.get_with_invoice(payment_id)
         if not original_payment:
             raise ValueError(f"Payment with ID {payment_id} not found")
 
+        if not original_payment.invoice:
+            raise ValueError(f"Invoice for payment {payment_id} not found")
+
         # Validate refund is possible
         if original_payment.status != PaymentStatus.COMPLETED:
             raise ValueError(f"Cannot refund payment with status {original_payment.status.value}")
@@ -145,51 +164,38 @@ class PaymentService:
         if refund_amount <= 0 or refund_amount > original_payment.amount:
             raise ValueError(f"Invalid refund amount: {refund_amount}")
 
-        # Get the invoice
-        invoice = self.invoice_repo.get_by_id(original_payment.invoice_id)
-        if not invoice:
-            raise ValueError(f"Invoice for payment {payment_id} not found")
-
-        try:
-            # Create a refund payment (negative amount)
-            refund_payment = self.payment_repo.create(
-                invoice_id=original_payment.invoice_id,
-                amount=-refund_amount,  # Negative amount for refund
-                payment_method=original_payment.payment_method,
-                payment_date=datetime.now(),
-                reference=f"REFUND-{original_payment.reference}" if original_payment.reference else None,
-                notes=f"Refund for payment {payment_id}. Reason: {refund_reason}",
-                status=PaymentStatus.COMPLETED,
-                is_refund=True,
-                refund_reason=refund_reason
-            )
-
-            # Update original payment status if full refund
-            if refund_amount >= original_payment.amount:
-                original_payment.status = PaymentStatus.REFUNDED
-
-            # Update invoice
-            invoice.amount_paid -= refund_amount
+        # Build the refund's reference and notes
+        refund_ref = f"REFUND-{original_payment.reference}" if original_payment.reference else None
+        refund_notes = f"Refund for payment {payment_id}. Reason: {refund_reason}"
+
+        # Create a refund payment (negative amount)
+        refund_payment = self.payment_repo.create(
+            invoice_id=original_payment.invoice_id,
+            amount=-refund_amount,  # Negative amount for refund
+            payment_method=original_payment.payment_method,
+            payment_date=datetime.utcnow(),
+            reference=refund_ref,
+            notes=refund_notes,
+            status=PaymentStatus.COMPLETED,
+            is_refund=True,
+            refund_reason=refund_reason
+        )
 
-            # Update invoice status if needed
-            if invoice.amount_paid < invoice.total:
-                if invoice.amount_paid > 0:
-                    invoice.status = InvoiceStatus.PARTIALLY_PAID
-                else:
-                    invoice.status = InvoiceStatus.SENT
+        # Update original payment status if full refund
+        if refund_amount >= original_payment.amount:
+            original_payment.status = PaymentStatus.REFUNDED
 
-            # Send notification if requested
-            if send_notification:
-                self._send_refund_notification(refund_payment, invoice)
+        # Update invoice amount and status atomically
+        invoice = self.invoice_repo.apply_refund(original_payment.invoice_id, refund_amount)
 
-            # Commit changes
-            self.session.commit()
+        # Write pending changes; the caller owns the commit
+        self.session.flush()
 
-            return refund_payment, invoice
+        # Queue notification once the caller's transaction commits
+        if send_notification:
+            run_after_commit(self.session, lambda: self._send_refund_notification(refund_payment, invoice))
 
-        except Exception as e:
-            self.session.rollback()
-            raise
+        return refund_payment, invoice
 
     def get_payment_history(self, invoice_id: int) -> List[Dict[str, Any]]:
         """
@@ -199,15 +205,61 @@ class PaymentService:
             invoice_id: ID of invoice
 
         Returns:
-            List of payments as dictionaries
+            List of payments as mappings with the keys of to_dict
         """
-        payments = self.payment_repo.get_payments_for_invoice(invoice_id)
-        return [self.payment_repo.to_dict(payment) for payment in payments]
+        return self.payment_repo.get_payment_dicts(invoice_id)
 
     def generate_payment_receipt(self, payment_id: int) -> Dict[str, Any]:
         """
         Generate a receipt for a payment.
 
+        Receipts are cached per process and keyed on the updated_at of the
+        payment, its customer and its company, so repeat calls only cost a
+        lookup of those timestamps. Each call returns its own copy, dated
+        at the time of the call.
+
+        Args:
+            payment_id: ID of payment
+
+        Returns:
+            Dictionary with receipt data
+
+        Raises:
+            ValueError: If payment not found
+        """
+        row = self.payment_repo.get_receipt_version(payment_id)
+        if not row:
+            raise ValueError(f"Payment with ID {payment_id} not found")
+
+        key = (payment_id, row.updated_at, row.customer_updated_at, row.user_updated_at)
+        with _receipt_cache_lock:
+            receipt = _receipt_cache.get(key)
+            if receipt is not None:
+                _receipt_cache.move_to_end(key)
+
+        if receipt is None:
+            receipt = self._build_receipt(payment_id)
+
+            with _receipt_cache_lock:
+                _receipt_cache[key] = receipt
+                if len(_receipt_cache) > RECEIPT_CACHE_SIZE:
+                    _receipt_cache.popitem(last=False)
+
+        # Hand out a copy, so callers cannot change the cached receipt
+        return dict(
+            receipt,
+            receipt_date=datetime.utcnow().isoformat(),
+            customer=dict(receipt['customer']),
+            company=dict(receipt['company'])
+        )
+
+    def _build_receipt(self, payment_id: int) -> Dict[str, Any]:
+        """
+        Build the receipt data for a payment from the database.
+
+        The receipt_date is left out; generate_payment_receipt sets it
+        on each call.
+
         Args:
             payment_id: ID of payment
 
@@ -217,11 +269,12 @@ class PaymentService:
         Raises:
             ValueError: If payment not found
         """
-        payment = self.payment_repo.get_by_id(payment_id)
+        # Load payment, invoice, customer and user in a single query
+        payment = self.payment_repo.get_receipt_row(payment_id)
         if not payment:
             raise ValueError(f"Payment with ID {payment_id} not found")
 
-        invoice = self.invoice_repo.get_by_id(payment.invoice_id)
+        invoice = payment.invoice
         if not invoice:
             raise ValueError(f"Invoice for payment {payment_id} not found")
 
@@ -231,7 +284,6 @@ class PaymentService:
         # Build receipt data
         receipt = {
             'receipt_number': f"RCP-{payment.id}",
-            'receipt_date': datetime.now().isoformat(),
             'payment_date': payment.payment_date.isoformat() if payment.payment_date else None,
             'payment_method': payment.payment_method_display,
             'reference': payment.reference,
@@ -250,52 +302,93 @@ class PaymentService:
 
         return receipt
 
-    def _send_payment_receipt(self, payment: Payment, invoice: Invoice) -> bool:
+    def _send_payment_receipt(self, payment: Payment, invoice: Invoice) -> None:
         """
-        Send payment receipt email.
+        Queue the payment receipt email.
 
         Args:
             payment: Payment that was made
             invoice: Updated invoice
+        """
+        send_payment_receipt_task.delay(payment.id)
+
+    def _send_refund_notification(self, refund: Payment, invoice: Invoice) -> None:
+        """
+        Queue the refund notification email.
+
+        Args:
+            refund: Refund payment
+            invoice: Updated invoice
+        """
+        send_refund_notification_task.delay(refund.id)
+
+    def deliver_payment_receipt(self, payment_id: int) -> bool:
+        """
+        Send payment receipt email.
+
+        Called by the email worker; use record_payment to queue receipts.
+
+        Args:
+            payment_id: ID of payment that was made
 
         Returns:
-            True if email sent successfully, False otherwise
+            True if email sent successfully, False if there is nothing to send
+
+        Raises:
+            EmailDeliveryError: If sending failed; the worker retries the task
         """
         if not self.email_service:
             return False
 
+        # The receipt already carries the recipient and invoice number
+        try:
+            receipt = self.generate_payment_receipt(payment_id)
+        except ValueError:
+            return False
+
         # Get customer email
-        recipient = invoice.customer.email if invoice.customer else None
+        recipient = receipt['customer']['email']
         if not recipient:
             return False
 
-        # Generate receipt data
-        receipt = self.generate_payment_receipt(payment.id)
-
         # Prepare email
-        subject = f"Payment Receipt for Invoice {invoice.invoice_number}"
+        subject = f"Payment Receipt for Invoice {receipt['invoice_number']}"
 
         # Send the email
-        return self.email_service.send_payment_receipt(
+        sent = self.email_service.send_payment_receipt(
             recipient=recipient,
             subject=subject,
             receipt_data=receipt
         )
+        if not sent:
+            raise EmailDeliveryError(f"Failed to send receipt for payment {payment_id}")
 
-    def _send_refund_notification(self, refund: Payment, invoice: Invoice) -> bool:
+        return True
+
+    def deliver_refund_notification(self, refund_id: int) -> bool:
         """
         Send refund notification email.
 
+        Called by the email worker; use process_refund to queue notifications.
+
         Args:
-            refund: Refund payment
-            invoice: Updated invoice
+            refund_id: ID of refund payment
 
         Returns:
-            True if email sent successfully, False otherwise
+            True if email sent successfully, False if there is nothing to send
+
+        Raises:
+            EmailDeliveryError: If sending failed; the worker retries the task
         """
         if not self.email_service:
             return False
 
+        refund = self.payment_repo.get_by_id(refund_id)
+        if not refund:
+            return False
+
+        invoice = refund.invoice
+
         # Get customer email
         recipient = invoice.customer.email if invoice.customer else None
         if not recipient:
@@ -305,10 +398,14 @@ class PaymentService:
         subject = f"Refund Processed for Invoice {invoice.invoice_number}"
 
         # Send the email
-        return self.email_service.send_refund_notification(
+        sent = self.email_service.send_refund_notification(
             recipient=recipient,
             subject=subject,
             refund_amount=abs(refund.amount),
             invoice_number=invoice.invoice_number,
             refund_reason=refund.refund_reason or "No reason provided"
-        )
\ No newline at end of file
+        )
+        if not sent:
+            raise EmailDeliveryError(f"Failed to send refund notification for payment {refund_id}")
+
+        return True
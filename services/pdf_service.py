@@ -4,25 +4,211 @@ PDF service for generating PDF documents.
 This module defines the PDFService class which handles
 generating PDF invoices and other documents.
 """
+import atexit
 import logging
 import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, BinaryIO, Callable
 
 # Import PDF generation library
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen import canvas
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate
 from reportlab.platypus import Image, Flowable, PageBreak
 
 from invoice_app.models.invoice import Invoice, InvoiceStatus
-from invoice_app.utils.currency_utils import format_currency
+from invoice_app.utils.currency_utils import get_formatter
 
 
 logger = logging.getLogger(__name__)
 
 
+def _build_styles():
+    """
+    Build the stylesheet used for PDF documents.
+
+    Returns:
+        ReportLab sample stylesheet extended with the custom invoice styles.
+    """
+    styles = getSampleStyleSheet()
+
+    # Heading styles
+    styles.add(ParagraphStyle(
+        name='InvoiceTitle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        spaceAfter=12
+    ))
+
+    # Status style
+    styles.add(ParagraphStyle(
+        name='DraftStatus',
+        parent=styles['Normal'],
+        fontSize=12,
+        textColor=colors.red,
+        alignment=1  # Center alignment
+    ))
+
+    # Header info styles
+    styles.add(ParagraphStyle(
+        name='HeaderLabel',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=colors.gray
+    ))
+
+    styles.add(ParagraphStyle(
+        name='HeaderValue',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=6
+    ))
+
+    # Table header style
+    styles.add(ParagraphStyle(
+        name='TableHeader',
+        parent=styles['Normal'],
+        fontSize=10,
+        fontName='Helvetica-Bold'
+    ))
+
+    # Footer style
+    styles.add(ParagraphStyle(
+        name='Footer',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=colors.gray,
+        alignment=1  # Center alignment
+    ))
+
+    return styles
+
+
+# Page margin on every side, in points
+PAGE_MARGIN = 72
+
+# Column widths as fractions of the content width
+ITEMS_COLUMN_RATIOS = (0.5, 0.15, 0.15, 0.2)  # Description, Quantity, Unit Price, Total
+TOTALS_COLUMN_RATIOS = (0.6, 0.2, 0.2)  # Empty (for alignment), Label, Amount
+
+# Invoices with at most this many items (and no notes, terms or text too
+# wide for its place) fit on one page and are drawn directly on a canvas
+FAST_PATH_MAX_ITEMS = 15
+
+# Row height of the tables drawn on the fast path
+FAST_PATH_ROW_HEIGHT = 20
+
+# Font of the items table body
+TABLE_FONT_NAME = 'Helvetica'
+TABLE_FONT_SIZE = 10
+
+# Left and right padding of a table cell (ReportLab's default), in points
+TABLE_CELL_PADDING = 6
+
+# Format of the "Generated on" footer line; timestamps are UTC
+GENERATED_AT_FORMAT = '%Y-%m-%d %H:%M:%S UTC'
+
+# Built once at import and shared (read-only) by all PDFService instances
+_STYLES = _build_styles()
+
+# Process pool for batch PDF generation, created on first use and replaced
+# when a batch asks for a different config; shut down at interpreter exit
+_batch_executor: Optional[ProcessPoolExecutor] = None
+_batch_executor_config: Optional[Dict[str, Any]] = None
+_batch_executor_lock = threading.Lock()
+
+# PDFService instance of a batch worker process
+_worker_service: Optional["PDFService"] = None
+
+
+def _fits_width(text: str, width: float, font_name: str = TABLE_FONT_NAME,
+                font_size: float = TABLE_FONT_SIZE) -> bool:
+    """
+    Check whether text fits on one line of the given width.
+
+    Args:
+        text: Text to measure.
+        width: Available width in points.
+        font_name: Name of the font the text is drawn in.
+        font_size: Font size in points.
+
+    Returns:
+        True if the text is no wider than width.
+    """
+    return pdfmetrics.stringWidth(text, font_name, font_size) <= width
+
+
+def _init_batch_worker(config: Dict[str, Any]) -> None:
+    """Create the PDFService reused by every job in a batch worker process."""
+    global _worker_service
+    _worker_service = PDFService(config)
+
+
+def _generate_in_worker(invoice: Invoice) -> bytes:
+    """Generate one invoice PDF inside a batch worker process."""
+    return _worker_service.generate_invoice_pdf(invoice)
+
+
+def _get_batch_executor(config: Dict[str, Any]) -> ProcessPoolExecutor:
+    """
+    Get the shared process pool for batch PDF generation.
+
+    The workers are initialized with config, so a pool created for a
+    different config is shut down and replaced.
+
+    Args:
+        config: PDF configuration for the worker processes.
+
+    Returns:
+        Process pool with one worker per CPU.
+    """
+    global _batch_executor, _batch_executor_config
+    with _batch_executor_lock:
+        if _batch_executor is not None and _batch_executor_config != config:
+            _batch_executor.shutdown(wait=True)
+            _batch_executor = None
+
+        if _batch_executor is None:
+            _batch_executor = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                initializer=_init_batch_worker,
+                initargs=(config,)
+            )
+            _batch_executor_config = dict(config)
+
+        return _batch_executor
+
+
+def _shutdown_batch_executor() -> None:
+    """Shut down the batch process pool, if one was started."""
+    global _batch_executor, _batch_executor_config
+    with _batch_executor_lock:
+        if _batch_executor is not None:
+            _batch_executor.shutdown(wait=False, cancel_futures=True)
+        _batch_executor = None
+        _batch_executor_config = None
+
+
+def _forget_batch_executor() -> None:
+    """Drop the pool inherited from the parent in a forked child (e.g. a Celery worker)."""
+    global _batch_executor, _batch_executor_config, _batch_executor_lock
+    _batch_executor = None
+    _batch_executor_config = None
+    _batch_executor_lock = threading.Lock()
+
+
+atexit.register(_shutdown_batch_executor)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_batch_executor)
+
+
 class PDFService:
     """Service for generating PDF documents."""
 
@@ -34,123 +220,363 @@ class PDFService:
             config: Optional PDF configuration.
         """
         self.config = config or {}
-        self.styles = getSampleStyleSheet()
-
-        # Define custom styles
-        self._setup_custom_styles()
-
-    def _setup_custom_styles(self) -> None:
-        """Set up custom paragraph styles for PDF documents."""
-        # Heading styles
-        self.styles.add(ParagraphStyle(
-            name='InvoiceTitle',
-            parent=self.styles['Heading1'],
-            fontSize=16,
-            spaceAfter=12
-        ))
+        self.styles = _STYLES
 
-        # Status style
-        self.styles.add(ParagraphStyle(
-            name='DraftStatus',
-            parent=self.styles['Normal'],
-            fontSize=12,
-            textColor=colors.red,
-            alignment=1  # Center alignment
-        ))
+    def generate_invoice_pdf(self, invoice: Invoice,
+                             out: Optional[BinaryIO] = None) -> Optional[bytes]:
+        """
+        Generate a PDF for an invoice.
 
-        # Header info styles
-        self.styles.add(ParagraphStyle(
-            name='HeaderLabel',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            textColor=colors.gray
-        ))
+        Args:
+            invoice: Invoice to generate PDF for.
+            out: Optional writable binary stream. When given, the PDF is
+                 written to it and nothing is returned.
 
-        self.styles.add(ParagraphStyle(
-            name='HeaderValue',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=6
-        ))
+        Returns:
+            PDF as bytes, or None if written to out.
+        """
+        if out is not None:
+            self.generate_invoice_pdf_stream(invoice, out)
+            return None
 
-        # Table header style
-        self.styles.add(ParagraphStyle(
-            name='TableHeader',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            fontName='Helvetica-Bold'
-        ))
+        # Create a buffer for the PDF
+        buffer = io.BytesIO()
 
-        # Footer style
-        self.styles.add(ParagraphStyle(
-            name='Footer',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            textColor=colors.gray,
-            alignment=1  # Center alignment
-        ))
+        self.generate_invoice_pdf_stream(invoice, buffer)
 
-    def generate_invoice_pdf(self, invoice: Invoice) -> bytes:
+        # Get PDF from buffer (hands over the internal bytes, no copy)
+        pdf_bytes = buffer.getvalue()
+        buffer.close()
+
+        return pdf_bytes
+
+    def generate_invoices_batch(self, invoices: List[Invoice]) -> List[bytes]:
         """
-        Generate a PDF for an invoice.
+        Generate PDFs for many invoices in parallel, for bulk exports.
+
+        ReportLab layout is CPU-bound, so the invoices are spread over a
+        process pool with one worker per CPU instead of sharing one core.
 
         Args:
-            invoice: Invoice to generate PDF for.
+            invoices: Invoices to generate PDFs for.
 
         Returns:
-            PDF as bytes.
+            PDF bytes for each invoice, in the same order.
         """
-        # Create a buffer for the PDF
-        buffer = io.BytesIO()
+        if len(invoices) <= 1:
+            return [self.generate_invoice_pdf(invoice) for invoice in invoices]
+
+        executor = _get_batch_executor(self.config)
+        chunksize = max(1, len(invoices) // (4 * (os.cpu_count() or 1)))
+
+        return list(executor.map(_generate_in_worker, invoices, chunksize=chunksize))
+
+    def generate_invoice_pdf_stream(self, invoice: Invoice, out: BinaryIO,
+                                    generated_at: Optional[datetime] = None) -> None:
+        """
+        Generate a PDF for an invoice and write it to a binary stream.
+
+        Args:
+            invoice: Invoice to generate PDF for.
+            out: Writable binary file object that receives the PDF.
+            generated_at: UTC time shown in the footer (default: now).
+        """
+        # Read the clock once for the whole document
+        self._write_invoice_pdf(invoice, out, generated_at or datetime.utcnow())
+
+    def _write_invoice_pdf(self, invoice: Invoice, out: BinaryIO, generated_at: datetime,
+                           page_template: Optional[PageTemplate] = None) -> None:
+        """
+        Write an invoice PDF with the fast path or the Platypus layout.
+
+        Args:
+            invoice: Invoice to generate PDF for.
+            out: Writable binary file object that receives the PDF.
+            generated_at: UTC time shown in the footer.
+            page_template: Optional prebuilt page template to lay out on,
+                           as shared by PDFBatchSession.
+        """
+        # Simple one-page invoices skip Platypus layout entirely
+        if self._fits_fast_path(invoice):
+            self.generate_invoice_pdf_fast(invoice, out, generated_at)
+            return
 
         # Create PDF document
-        doc = SimpleDocTemplate(
-            buffer,
+        doc_options = dict(
             pagesize=letter,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=72,
+            rightMargin=PAGE_MARGIN,
+            leftMargin=PAGE_MARGIN,
+            topMargin=PAGE_MARGIN,
+            bottomMargin=PAGE_MARGIN,
             title=f"Invoice {invoice.invoice_number}"
         )
+        if page_template is None:
+            doc = SimpleDocTemplate(out, **doc_options)
+        else:
+            doc = BaseDocTemplate(out, pageTemplates=[page_template], **doc_options)
+
+        # Build PDF
+        doc.build(self._build_invoice_elements(invoice, doc.width, generated_at))
+
+    def _build_invoice_elements(self, invoice: Invoice, content_width: float,
+                                generated_at: datetime) -> list:
+        """
+        Build the Platypus flowables for an invoice.
+
+        Args:
+            invoice: Invoice to generate PDF for.
+            content_width: Width of the page frame in points.
+            generated_at: UTC time shown in the footer.
 
+        Returns:
+            List of flowables making up the invoice.
+        """
         # List to hold content elements
         elements = []
 
+        # Currency formatter shared by all sections
+        fmt = get_formatter(invoice.currency)
+
         # Add invoice header
-        self._add_invoice_header(elements, invoice)
+        self._add_invoice_header(elements, invoice, content_width)
 
         # Add customer and invoice details
-        self._add_invoice_details(elements, invoice)
+        self._add_invoice_details(elements, invoice, content_width)
 
         # Add invoice items table
-        self._add_invoice_items(elements, invoice)
+        self._add_invoice_items(elements, invoice, content_width, fmt)
 
         # Add totals
-        self._add_invoice_totals(elements, invoice)
+        self._add_invoice_totals(elements, invoice, content_width, fmt)
 
         # Add notes and terms
         self._add_notes_and_terms(elements, invoice)
 
         # Add footer
-        self._add_footer(elements, invoice)
+        self._add_footer(elements, invoice, generated_at)
 
-        # Build PDF
-        doc.build(elements)
+        return elements
 
-        # Get PDF from buffer
-        pdf_bytes = buffer.getvalue()
-        buffer.close()
+    def _fits_fast_path(self, invoice: Invoice) -> bool:
+        """
+        Check whether an invoice can be drawn with the fixed one-page layout.
 
-        return pdf_bytes
+        Args:
+            invoice: Invoice to check.
+
+        Returns:
+            True if the invoice fits on one page without text wrapping.
+        """
+        if len(invoice.items) > FAST_PATH_MAX_ITEMS or invoice.notes or invoice.terms:
+            return False
+
+        fmt = get_formatter(invoice.currency)
+        content_width = letter[0] - 2 * PAGE_MARGIN
+        cell_widths = [content_width * ratio - 2 * TABLE_CELL_PADDING for ratio in ITEMS_COLUMN_RATIOS]
+        label_width, amount_width = [content_width * ratio - 2 * TABLE_CELL_PADDING
+                                     for ratio in TOTALS_COLUMN_RATIOS[1:]]
+
+        # (text, width, font name, font size) of every variable field drawn
+        fields = [
+            (f"INVOICE #{invoice.invoice_number}", content_width, 'Helvetica-Bold', 16),
+            (invoice.customer_name, content_width / 2 - TABLE_CELL_PADDING, 'Helvetica', 10),
+            (f"Email: {invoice.customer_email}", content_width / 2 - TABLE_CELL_PADDING, 'Helvetica', 10)
+        ]
+        for item in invoice.items:
+            cells = (item.description, f"{item.quantity:.2f}", fmt(item.unit_price), fmt(item.total))
+            fields.extend(
+                (text, width, TABLE_FONT_NAME, TABLE_FONT_SIZE) for text, width in zip(cells, cell_widths)
+            )
+        for label, amount in self._fast_path_totals(invoice, fmt):
+            # Measured bold, as the grand total is
+            fields.append((label, label_width, 'Helvetica-Bold', 10))
+            fields.append((amount, amount_width, 'Helvetica-Bold', 10))
+
+        return all(_fits_width(text, width, font_name, font_size)
+                   for text, width, font_name, font_size in fields)
+
+    def _fast_path_totals(self, invoice: Invoice, fmt: Callable[[float], str]) -> list:
+        """
+        Build the totals rows drawn by the fast path.
+
+        Args:
+            invoice: Invoice to build totals for.
+            fmt: Formatter for amounts in the invoice currency.
 
-    def _add_invoice_header(self, elements: list, invoice: Invoice) -> None:
+        Returns:
+            List of (label, amount) tuples, the grand total last.
+        """
+        totals = [("Subtotal:", fmt(invoice.subtotal))]
+        if invoice.discount_percentage > 0:
+            totals.append((f"Discount ({invoice.discount_percentage:.2f}%):",
+                           f"- {fmt(invoice.discount_amount)}"))
+        if invoice.vat_rate > 0:
+            totals.append((f"VAT ({invoice.vat_rate:.2f}%):", fmt(invoice.vat_amount)))
+        totals.append(("Total:", fmt(invoice.total)))
+        return totals
+
+    def generate_invoice_pdf_fast(self, invoice: Invoice, out: BinaryIO,
+                                  generated_at: Optional[datetime] = None) -> None:
+        """
+        Draw a one-page invoice directly on a canvas and write it to a stream.
+
+        Produces the same sections as the Platypus layout without the
+        flowable layout pass. Only use it for invoices accepted by
+        _fits_fast_path, as nothing is wrapped or split across pages.
+
+        Args:
+            invoice: Invoice to generate PDF for.
+            out: Writable binary file object that receives the PDF.
+            generated_at: UTC time shown in the footer (default: now).
+        """
+        generated_at = generated_at or datetime.utcnow()
+        fmt = get_formatter(invoice.currency)
+        page_width, page_height = letter
+        left = PAGE_MARGIN
+        right = page_width - PAGE_MARGIN
+        content_width = right - left
+        center = page_width / 2
+
+        c = canvas.Canvas(out, pagesize=letter)
+        c.setTitle(f"Invoice {invoice.invoice_number}")
+
+        # Title and draft marker
+        y = page_height - PAGE_MARGIN - 16
+        c.setFont('Helvetica-Bold', 16)
+        c.drawString(left, y, f"INVOICE #{invoice.invoice_number}")
+        y -= 28
+
+        if invoice.status == InvoiceStatus.DRAFT:
+            c.setFillColor(colors.red)
+            c.setFont('Helvetica', 12)
+            c.drawCentredString(center, y, "DRAFT - NOT FINAL")
+            c.setFillColor(colors.black)
+            y -= 24
+
+        # From / To columns
+        columns = [
+            ("FROM:", [
+                "Your Company Name",
+                "Your Address",
+                "Your City, State ZIP",
+                "Email: support@yourcompany.com",
+                "Phone: (123) 456-7890"
+            ]),
+            ("TO:", [
+                invoice.customer_name,
+                f"Email: {invoice.customer_email}"
+            ])
+        ]
+        y = self._draw_label_columns(c, columns, left, content_width / 2, y)
+        y -= 24
+
+        # Invoice dates and status
+        columns = [
+            ("INVOICE DATE:", [invoice.issue_date.strftime("%Y-%m-%d")]),
+            ("DUE DATE:", [invoice.due_date.strftime("%Y-%m-%d")]),
+            ("STATUS:", [str(invoice.status).upper()])
+        ]
+        y = self._draw_label_columns(c, columns, left, content_width / 3, y)
+        y -= 24
+
+        # Items table
+        edges = [left]
+        for ratio in ITEMS_COLUMN_RATIOS:
+            edges.append(edges[-1] + content_width * ratio)
+
+        rows = [["Description", "Quantity", "Unit Price", "Total"]]
+        for item in invoice.items:
+            rows.append([item.description, f"{item.quantity:.2f}", fmt(item.unit_price), fmt(item.total)])
+
+        top = y
+        bottom = top - FAST_PATH_ROW_HEIGHT * len(rows)
+        c.setFillColor(colors.lightgrey)
+        c.rect(left, top - FAST_PATH_ROW_HEIGHT, content_width, FAST_PATH_ROW_HEIGHT, stroke=0, fill=1)
+        c.setFillColor(colors.black)
+        c.setStrokeColor(colors.grey)
+        c.setLineWidth(0.5)
+        c.grid(edges, [top - FAST_PATH_ROW_HEIGHT * i for i in range(len(rows) + 1)])
+
+        for index, row in enumerate(rows):
+            baseline = top - FAST_PATH_ROW_HEIGHT * (index + 1) + 7
+            c.setFont('Helvetica-Bold' if index == 0 else TABLE_FONT_NAME, TABLE_FONT_SIZE)
+            c.drawString(edges[0] + 6, baseline, row[0])
+            for column in range(1, len(row)):
+                c.drawRightString(edges[column + 1] - 6, baseline, row[column])
+
+        # Totals
+        *totals, (total_label, total_amount) = self._fast_path_totals(invoice, fmt)
+
+        label_right = left + content_width * (TOTALS_COLUMN_RATIOS[0] + TOTALS_COLUMN_RATIOS[1]) - 6
+        y = bottom - 12
+        c.setFont('Helvetica', 10)
+        for label, amount in totals:
+            y -= FAST_PATH_ROW_HEIGHT
+            c.drawRightString(label_right, y + 7, label)
+            c.drawRightString(right - 6, y + 7, amount)
+
+        y -= FAST_PATH_ROW_HEIGHT
+        c.setStrokeColor(colors.black)
+        c.setLineWidth(1)
+        c.line(left + content_width * TOTALS_COLUMN_RATIOS[0], y + FAST_PATH_ROW_HEIGHT, right, y + FAST_PATH_ROW_HEIGHT)
+        c.setFont('Helvetica-Bold', 10)
+        c.drawRightString(label_right, y + 7, total_label)
+        c.drawRightString(right - 6, y + 7, total_amount)
+        y -= 36
+
+        # Footer
+        c.setFillColor(colors.gray)
+        c.setFont('Helvetica', 8)
+        for line in (
+            "Thank you for your business!",
+            f"Please make payment by the due date ({invoice.due_date.strftime('%Y-%m-%d')}).",
+            f"Generated on {generated_at.strftime(GENERATED_AT_FORMAT)}"
+        ):
+            c.drawCentredString(center, y, line)
+            y -= 12
+
+        c.showPage()
+        c.save()
+
+    def _draw_label_columns(self, c: canvas.Canvas, columns: list, left: float,
+                            column_width: float, y: float) -> float:
+        """
+        Draw side-by-side columns of a small gray label over value lines.
+
+        Args:
+            c: Canvas to draw on.
+            columns: List of (label, value lines) tuples, one per column.
+            left: X position of the first column.
+            column_width: Width of each column.
+            y: Baseline of the labels.
+
+        Returns:
+            Y position below the tallest column.
+        """
+        lowest = y
+        for index, (label, values) in enumerate(columns):
+            x = left + column_width * index
+            line_y = y
+            c.setFillColor(colors.gray)
+            c.setFont('Helvetica', 8)
+            c.drawString(x, line_y, label)
+            c.setFillColor(colors.black)
+            c.setFont('Helvetica', 10)
+            for value in values:
+                line_y -= 16
+                c.drawString(x, line_y, value)
+            lowest = min(lowest, line_y)
+        return lowest
+
+    def _add_invoice_header(self, elements: list, invoice: Invoice,
+                            content_width: float) -> None:
         """
         Add invoice header to PDF elements.
 
         Args:
             elements: List of PDF elements to append to.
             invoice: Invoice to generate header for.
+            content_width: Width of the page content area in points.
         """
         # Add title
         elements.append(Paragraph(f"INVOICE #{invoice.invoice_number}", self.styles['InvoiceTitle']))
@@ -182,19 +608,21 @@ class PDFService:
         ]
 
         # Create table
-        header_table = Table(data, colWidths=[doc.width/2 - 12, doc.width/2 - 12])
+        header_table = Table(data, colWidths=[content_width/2 - 12, content_width/2 - 12])
 
         # Add table to elements
         elements.append(header_table)
         elements.append(Spacer(1, 24))
 
-    def _add_invoice_details(self, elements: list, invoice: Invoice) -> None:
+    def _add_invoice_details(self, elements: list, invoice: Invoice,
+                             content_width: float) -> None:
         """
         Add invoice details to PDF elements.
 
         Args:
             elements: List of PDF elements to append to.
             invoice: Invoice to generate details for.
+            content_width: Width of the page content area in points.
         """
         # Create a table for invoice details
         data = [
@@ -218,19 +646,22 @@ class PDFService:
         ]
 
         # Create table
-        details_table = Table(data, colWidths=[doc.width/3 - 8, doc.width/3 - 8, doc.width/3 - 8])
+        details_table = Table(data, colWidths=[content_width/3 - 8, content_width/3 - 8, content_width/3 - 8])
 
         # Add table to elements
         elements.append(details_table)
         elements.append(Spacer(1, 24))
 
-    def _add_invoice_items(self, elements: list, invoice: Invoice) -> None:
+    def _add_invoice_items(self, elements: list, invoice: Invoice,
+                           content_width: float, fmt: Callable[[float], str]) -> None:
         """
         Add invoice items table to PDF elements.
 
         Args:
             elements: List of PDF elements to append to.
             invoice: Invoice to generate items table for.
+            content_width: Width of the page content area in points.
+            fmt: Formatter for amounts in the invoice currency.
         """
         # Create table header
         headers = [
@@ -243,24 +674,27 @@ class PDFService:
         # Create table data
         data = [headers]
 
-        # Add item rows
+        # Width available to a description inside its cell
+        description_width = content_width * ITEMS_COLUMN_RATIOS[0] - 2 * TABLE_CELL_PADDING
+
+        # Add item rows as plain strings; only descriptions too wide for
+        # their column pay for a wrapping Paragraph
         for item in invoice.items:
+            description = item.description
+            if not _fits_width(description, description_width):
+                description = Paragraph(description, self.styles['Normal'])
+
             data.append([
-                Paragraph(item.description, self.styles['Normal']),
-                Paragraph(f"{item.quantity:.2f}", self.styles['Normal']),
-                Paragraph(format_currency(item.unit_price, invoice.currency), self.styles['Normal']),
-                Paragraph(format_currency(item.total, invoice.currency), self.styles['Normal'])
+                description,
+                f"{item.quantity:.2f}",
+                fmt(item.unit_price),
+                fmt(item.total)
             ])
 
         # Create table
         items_table = Table(
             data,
-            colWidths=[
-                doc.width * 0.5,  # Description
-                doc.width * 0.15,  # Quantity
-                doc.width * 0.15,  # Unit Price
-                doc.width * 0.2    # Total
-            ]
+            colWidths=[content_width * ratio for ratio in ITEMS_COLUMN_RATIOS]
         )
 
         # Add table style
@@ -276,19 +710,24 @@ class PDFService:
             ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
             ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
             ('TOPPADDING', (0, 1), (-1, -1), 6),
+            ('FONTNAME', (0, 1), (-1, -1), TABLE_FONT_NAME),
+            ('FONTSIZE', (0, 1), (-1, -1), TABLE_FONT_SIZE),
         ]))
 
         # Add table to elements
         elements.append(items_table)
         elements.append(Spacer(1, 12))
 
-    def _add_invoice_totals(self, elements: list, invoice: Invoice) -> None:
+    def _add_invoice_totals(self, elements: list, invoice: Invoice,
+                            content_width: float, fmt: Callable[[float], str]) -> None:
         """
         Add invoice totals to PDF elements.
 
         Args:
             elements: List of PDF elements to append to.
             invoice: Invoice to generate totals for.
+            content_width: Width of the page content area in points.
+            fmt: Formatter for amounts in the invoice currency.
         """
         # Create table data for totals
         data = []
@@ -297,7 +736,7 @@ class PDFService:
         data.append([
             "",
             Paragraph("Subtotal:", self.styles['Normal']),
-            Paragraph(format_currency(invoice.subtotal, invoice.currency), self.styles['Normal'])
+            Paragraph(fmt(invoice.subtotal), self.styles['Normal'])
         ])
 
         # Add discount if applicable
@@ -305,7 +744,7 @@ class PDFService:
             data.append([
                 "",
                 Paragraph(f"Discount ({invoice.discount_percentage:.2f}%):", self.styles['Normal']),
-                Paragraph(f"- {format_currency(invoice.discount_amount, invoice.currency)}", self.styles['Normal'])
+                Paragraph(f"- {fmt(invoice.discount_amount)}", self.styles['Normal'])
             ])
 
         # Add VAT if applicable
@@ -313,24 +752,20 @@ class PDFService:
             data.append([
                 "",
                 Paragraph(f"VAT ({invoice.vat_rate:.2f}%):", self.styles['Normal']),
-                Paragraph(format_currency(invoice.vat_amount, invoice.currency), self.styles['Normal'])
+                Paragraph(fmt(invoice.vat_amount), self.styles['Normal'])
             ])
 
         # Add total
         data.append([
             "",
             Paragraph("Total:", self.styles['TableHeader']),
-            Paragraph(format_currency(invoice.total, invoice.currency), self.styles['TableHeader'])
+            Paragraph(fmt(invoice.total), self.styles['TableHeader'])
         ])
 
         # Create table
         totals_table = Table(
             data,
-            colWidths=[
-                doc.width * 0.6,  # Empty column (for alignment)
-                doc.width * 0.2,  # Label
-                doc.width * 0.2   # Amount
-            ]
+            colWidths=[content_width * ratio for ratio in TOTALS_COLUMN_RATIOS]
         )
 
         # Add table style
@@ -366,13 +801,14 @@ class PDFService:
             elements.append(Paragraph(invoice.terms, self.styles['Normal']))
             elements.append(Spacer(1, 12))
 
-    def _add_footer(self, elements: list, invoice: Invoice) -> None:
+    def _add_footer(self, elements: list, invoice: Invoice, generated_at: datetime) -> None:
         """
         Add footer to PDF elements.
 
         Args:
             elements: List of PDF elements to append to.
             invoice: Invoice to generate footer for.
+            generated_at: UTC time the document was generated.
         """
         # Add thank you note
         elements.append(Paragraph("Thank you for your business!", self.styles['Footer']))
@@ -385,6 +821,77 @@ class PDFService:
 
         # Add generator note
         elements.append(Paragraph(
-            f"Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"Generated on {generated_at.strftime(GENERATED_AT_FORMAT)}",
             self.styles['Footer']
-        ))
\ No newline at end of file
+        ))
+
+
+class PDFBatchSession:
+    """
+    Context manager for generating many invoice PDFs in one process.
+
+    A single page template is built on entry and shared by every
+    document, so each invoice only builds its own flowables. Use it
+    for statement runs and bulk exports; a session is not thread-safe.
+
+    Example:
+        with PDFBatchSession(pdf_service) as batch:
+            pdfs = [batch.generate_invoice_pdf(invoice) for invoice in invoices]
+    """
+
+    def __init__(self, pdf_service: Optional[PDFService] = None):
+        """
+        Initialize the batch session.
+
+        Args:
+            pdf_service: PDF service whose layout is used (default: a new one).
+        """
+        self.pdf_service = pdf_service or PDFService()
+        self._page_template: Optional[PageTemplate] = None
+
+    def __enter__(self) -> "PDFBatchSession":
+        """Build the shared page template."""
+        page_width, page_height = letter
+        frame = Frame(
+            PAGE_MARGIN,
+            PAGE_MARGIN,
+            page_width - 2 * PAGE_MARGIN,
+            page_height - 2 * PAGE_MARGIN,
+            id='normal'
+        )
+        self._page_template = PageTemplate(id='Invoice', frames=[frame], pagesize=letter)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Release the shared page template."""
+        self._page_template = None
+
+    def generate_invoice_pdf(self, invoice: Invoice) -> bytes:
+        """
+        Generate a PDF for an invoice.
+
+        Args:
+            invoice: Invoice to generate PDF for.
+
+        Returns:
+            PDF as bytes.
+        """
+        buffer = io.BytesIO()
+        self.generate_invoice_pdf_stream(invoice, buffer)
+        return buffer.getvalue()
+
+    def generate_invoice_pdf_stream(self, invoice: Invoice, out: BinaryIO) -> None:
+        """
+        Generate a PDF for an invoice and write it to a binary stream.
+
+        Args:
+            invoice: Invoice to generate PDF for.
+            out: Writable binary file object that receives the PDF.
+
+        Raises:
+            RuntimeError: If called outside the with block.
+        """
+        if self._page_template is None:
+            raise RuntimeError("PDFBatchSession must be used as a context manager")
+
+        self.pdf_service._write_invoice_pdf(invoice, out, datetime.utcnow(), self._page_template)
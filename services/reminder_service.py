@@ -4,20 +4,53 @@ Reminder service for handling invoice payment reminders.
 This module defines the ReminderService class which manages
 the scheduling and sending of payment reminders for overdue invoices.
 """
+import copy
 import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Deque, List, Dict, Any, Optional, Tuple
 
-from invoice_app.models.invoice import Invoice, InvoiceStatus
+from cachetools import TTLCache
+
+from invoice_app.models.invoice import Invoice
 from invoice_app.models.reminder import ReminderSettings
 from invoice_app.repositories.invoice_repository import InvoiceRepository
 from invoice_app.repositories.reminder_repository import ReminderRepository
-from invoice_app.services.email_service import EmailService
+from invoice_app.services.email_service import EmailDeliveryError, EmailService, EmailSession
 from invoice_app.services.pdf_service import PDFService
+from invoice_app.tasks.email_tasks import send_reminder_task
 
 
 logger = logging.getLogger(__name__)
 
+# A run is aborted once at least this many invoices were processed...
+ABORT_MIN_PROCESSED = 30
+
+# ...and at least 1 in ABORT_FAILURE_RATIO sends failed
+ABORT_FAILURE_RATIO = 3
+
+# Invoices fetched per page by process_reminders. The page's sent reminders
+# are committed before the next page, so a failed run re-sends at most this many.
+RECORD_BATCH_SIZE = 100
+
+# Number of invoice numbers included in a reminder run's summary log
+RUN_LOG_SAMPLE_SIZE = 20
+
+# Maximum number of rendered reminders waiting for the sender thread
+SEND_QUEUE_DEPTH = 4
+
+# Reminder settings by owner ID, shared by all ReminderService instances.
+# Entries expire after SETTINGS_CACHE_TTL seconds, bounding staleness
+# when settings are changed by another process. Cached instances are never
+# handed out or modified; callers get their own copy.
+SETTINGS_CACHE_SIZE = 10_000
+SETTINGS_CACHE_TTL = 60
+
+_settings_cache: TTLCache = TTLCache(maxsize=SETTINGS_CACHE_SIZE, ttl=SETTINGS_CACHE_TTL)
+_settings_cache_lock = threading.Lock()
+
 
 class ReminderService:
     """Service for handling invoice payment reminders."""
@@ -45,12 +78,22 @@ class ReminderService:
         """
         Get reminder settings for an owner.
 
+        Settings are cached for up to SETTINGS_CACHE_TTL seconds. Each call
+        returns a separate copy, which the caller may modify.
+
         Args:
             owner_id: ID of the settings owner.
 
         Returns:
             ReminderSettings instance.
         """
+        with _settings_cache_lock:
+            cached = _settings_cache.get(owner_id)
+        if cached is not None:
+            # Deep copy rather than dataclasses.replace, which would run
+            # __post_init__ and give the copy a new id
+            return copy.deepcopy(cached)
+
         # Try to get existing settings
         settings = self.reminder_repository.get_by_owner_id(owner_id)
 
@@ -59,6 +102,9 @@ class ReminderService:
             settings = ReminderSettings(owner_id=owner_id)
             self.reminder_repository.save(settings)
 
+        with _settings_cache_lock:
+            _settings_cache[owner_id] = copy.deepcopy(settings)
+
         return settings
 
     def update_settings(self, owner_id: str, data: Dict[str, Any]) -> ReminderSettings:
@@ -72,9 +118,13 @@ class ReminderService:
         Returns:
             Updated ReminderSettings instance.
         """
-        # Get current settings
+        # Get a private copy of the current settings
         settings = self.get_settings(owner_id)
 
+        # Make the next get_settings reload them
+        with _settings_cache_lock:
+            _settings_cache.pop(owner_id, None)
+
         # Update fields
         for key, value in data.items():
             if hasattr(settings, key):
@@ -83,7 +133,7 @@ class ReminderService:
         # Save updated settings
         self.reminder_repository.save(settings)
 
-        logger.info(f"Updated reminder settings for owner {owner_id}")
+        logger.info("Updated reminder settings for owner %s", owner_id)
         return settings
 
     def process_reminders(self, owner_id: str) -> Dict[str, Any]:
@@ -95,108 +145,292 @@ class ReminderService:
 
         Returns:
             Dictionary with results (invoices processed, reminders sent, errors).
+            'aborted' is True if the run stopped early because too many
+            sends failed. Sent reminders are committed every
+            RECORD_BATCH_SIZE invoices rather than at the end of the run.
+            'processed' counts the invoices fetched in this run, while
+            'estimated_total' estimates all of the owner's overdue invoices
+            (0 when the run is skipped).
         """
         # Get settings
         settings = self.get_settings(owner_id)
 
         # Skip if reminders are disabled
         if not settings.enabled:
-            logger.info(f"Reminders are disabled for owner {owner_id}")
+            logger.info("Reminders are disabled for owner %s", owner_id)
             return {
                 'processed': 0,
                 'sent': 0,
                 'errors': 0,
                 'skipped': 0,
-                'disabled': True
+                'disabled': True,
+                'aborted': False,
+                'no_thresholds': False,
+                'estimated_total': 0
             }
 
-        # Get overdue invoices
-        overdue_invoices = self.invoice_repository.list({
-            'status': InvoiceStatus.OVERDUE.value
-        })
+        # Skip if no reminder days are configured; no invoice can be due
+        if not settings.reminder_days:
+            logger.info("No reminder days configured for owner %s", owner_id)
+            return {
+                'processed': 0,
+                'sent': 0,
+                'errors': 0,
+                'skipped': 0,
+                'disabled': False,
+                'aborted': False,
+                'no_thresholds': True,
+                'estimated_total': 0
+            }
 
         # Track results
         results = {
-            'processed': len(overdue_invoices),
+            'processed': 0,
             'sent': 0,
             'errors': 0,
             'skipped': 0,
-            'disabled': False
+            'disabled': False,
+            'aborted': False,
+            'no_thresholds': False,
+            # Planner estimate of the owner's overdue invoices, for progress display
+            'estimated_total': self.invoice_repository.estimated_overdue_count(owner_id)
         }
 
-        # Process each invoice
-        for invoice in overdue_invoices:
+        # One reference time for the whole run, so day counts are consistent
+        now = datetime.now()
+
+        # (invoice_id, sent_at) of reminders sent during this run
+        pending_updates: List[Tuple[str, datetime]] = []
+
+        # (subject, message) templates by reminder number, looked up once per run
+        templates: Dict[int, Tuple[str, str]] = {}
+
+        # Invoice numbers reminded in this run, for the run summary log
+        sent_numbers: List[str] = []
+
+        # Sends queued on the sender thread and not yet collected, oldest first
+        in_flight: Deque[Tuple[str, str, int, Future]] = deque()
+
+        # Send every reminder of the run over one SMTP connection. A single
+        # sender thread sends reminder K while this thread renders K+1.
+        with self.email_service.open_session() as smtp, \
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix='reminder-send') as sender:
             try:
-                # Calculate days overdue
-                days_overdue = (datetime.now() - invoice.due_date).days
-
-                # Get which reminder to send (1-based)
-                reminder_number = self._get_reminder_number(settings, invoice)
-
-                if reminder_number:
-                    # Send reminder
-                    sent = self._send_reminder(invoice, reminder_number, days_overdue, settings)
-
-                    if sent:
-                        # Record that reminder was sent
-                        invoice.record_reminder_sent()
-                        self.invoice_repository.save(invoice)
-
-                        results['sent'] += 1
-                        logger.info(f"Sent reminder #{reminder_number} for invoice {invoice.invoice_number}")
-                    else:
-                        results['errors'] += 1
-                        logger.error(f"Failed to send reminder for invoice {invoice.invoice_number}")
-                else:
-                    # No reminder due yet
-                    results['skipped'] += 1
-            except Exception as e:
-                results['errors'] += 1
-                logger.error(f"Error processing reminder for invoice {invoice.invoice_number}: {str(e)}")
+                # Stream the overdue invoices whose next reminder is due, a page at a time
+                for page in self.invoice_repository.iter_due_for_reminder_pages(
+                        owner_id, settings.reminder_days, batch_size=RECORD_BATCH_SIZE, now=now):
+                    for invoice, reminder_number in page:
+                        results['processed'] += 1
+                        try:
+                            # Calculate days overdue
+                            days_overdue = (now - invoice.due_date).days
+
+                            # Render now, send in the background
+                            email = self._build_reminder(invoice, reminder_number, days_overdue, settings,
+                                                         templates)
+                            in_flight.append((invoice.id, invoice.invoice_number, reminder_number,
+                                              sender.submit(smtp.send, **email)))
+                        except Exception as e:
+                            results['errors'] += 1
+                            logger.error("Error processing reminder for invoice %s: %s",
+                                         invoice.invoice_number, e)
+
+                        # Bound the rendered emails waiting to be sent
+                        while len(in_flight) >= SEND_QUEUE_DEPTH:
+                            self._collect_send(in_flight.popleft(), results, pending_updates, sent_numbers, now)
+
+                        # Stop if sending is failing systematically (e.g. SMTP auth or rate limit)
+                        if self._should_abort(results):
+                            results['aborted'] = True
+                            logger.error("Aborting reminder run for owner %s: %d of %d sends failed",
+                                         owner_id, results['errors'], results['sent'] + results['errors'])
+                            break
+
+                    # Commit the page's reminders before fetching the next page
+                    while in_flight:
+                        self._collect_send(in_flight.popleft(), results, pending_updates, sent_numbers, now)
+                    self._record_sent(pending_updates)
+
+                    if results['aborted']:
+                        break
+            finally:
+                # Still record the reminders sent before an error, so the
+                # next run does not send them again
+                while in_flight:
+                    self._collect_send(in_flight.popleft(), results, pending_updates, sent_numbers, now)
+                if pending_updates:
+                    self.invoice_repository.session.rollback()
+                    self._record_sent(pending_updates)
 
         # Update last run timestamp
         settings.update_last_run()
         self.reminder_repository.save(settings)
 
+        # One summary record per run instead of a line per reminder
+        logger.info(
+            "Reminder run for owner %s: %d processed, %d sent, %d errors%s",
+            owner_id, results['processed'], results['sent'], results['errors'],
+            " (aborted)" if results['aborted'] else "",
+            extra={
+                'owner_id': owner_id,
+                'results': results,
+                'sample': sent_numbers[:RUN_LOG_SAMPLE_SIZE]
+            }
+        )
+
         return results
 
-    def _get_reminder_number(self, settings: ReminderSettings, invoice: Invoice) -> Optional[int]:
+    def _collect_send(self, entry: Tuple[str, str, int, Future], results: Dict[str, Any],
+                      pending_updates: List[Tuple[str, datetime]], sent_numbers: List[str],
+                      now: datetime) -> None:
         """
-        Determine which reminder number to send for an invoice.
+        Wait for a queued reminder send and record its outcome.
 
         Args:
-            settings: Reminder settings.
-            invoice: Invoice to check.
+            entry: (invoice_id, invoice_number, reminder_number, future) of the send.
+            results: Running totals of the reminder run, updated in place.
+            pending_updates: Sent reminders to record, appended to on success.
+            sent_numbers: Invoice numbers reminded, appended to on success.
+            now: Reference time of the run, recorded as the send time.
+        """
+        invoice_id, invoice_number, reminder_number, future = entry
+
+        if future.result():
+            # Record that reminder was sent, saved in bulk at the end of the page
+            pending_updates.append((invoice_id, now))
+
+            results['sent'] += 1
+            sent_numbers.append(invoice_number)
+            logger.debug("Sent reminder #%d for invoice %s", reminder_number, invoice_number)
+        else:
+            results['errors'] += 1
+            logger.error("Failed to send reminder for invoice %s", invoice_number)
+
+    def _record_sent(self, pending_updates: List[Tuple[str, datetime]]) -> None:
+        """
+        Record sent reminders in one statement and commit them.
+
+        Args:
+            pending_updates: (invoice_id, sent_at) of sent reminders, cleared
+                             once they are committed.
+        """
+        if not pending_updates:
+            return
+
+        self.invoice_repository.bulk_record_reminder_sent(pending_updates)
+        self.invoice_repository.session.commit()
+        pending_updates.clear()
+
+    def _should_abort(self, results: Dict[str, Any]) -> bool:
+        """
+        Check whether a reminder run is failing too often to continue.
+
+        Small runs are never aborted, so a single failure cannot stop them.
+
+        Args:
+            results: Running totals of the reminder run.
+
+        Returns:
+            True if the run should stop.
+        """
+        if results['processed'] < ABORT_MIN_PROCESSED:
+            return False
+
+        attempted = results['sent'] + results['errors']
+        return results['errors'] * ABORT_FAILURE_RATIO >= attempted > 0
+
+    def enqueue_reminders(self, owner_id: str) -> Dict[str, Any]:
+        """
+        Queue a background task for every reminder that is due.
+
+        Unlike process_reminders this returns as soon as the tasks are
+        queued; the email workers render and send the reminders in parallel.
+
+        Args:
+            owner_id: ID of the owner to queue reminders for.
 
         Returns:
-            Reminder number (1-based) to send, or None if no reminder should be sent.
+            Dictionary with results (invoices processed, reminders queued).
         """
-        # Don't send reminders for non-overdue invoices
-        if invoice.status != InvoiceStatus.OVERDUE:
-            return None
+        # Get settings
+        settings = self.get_settings(owner_id)
+
+        # Skip if reminders are disabled
+        if not settings.enabled:
+            logger.info("Reminders are disabled for owner %s", owner_id)
+            return {
+                'processed': 0,
+                'queued': 0,
+                'skipped': 0,
+                'disabled': True
+            }
+
+        results = {
+            'processed': 0,
+            'queued': 0,
+            'skipped': 0,
+            'disabled': False
+        }
 
-        # Calculate days overdue
-        days_overdue = (datetime.now() - invoice.due_date).days
+        for invoice, reminder_number in self.invoice_repository.iter_due_for_reminder(
+                owner_id, settings.reminder_days):
+            results['processed'] += 1
 
-        # Get how many reminders have already been sent
-        reminders_sent = len(invoice.reminder_sent_at)
+            send_reminder_task.delay(invoice.id, reminder_number, owner_id)
+            results['queued'] += 1
 
-        # Check if we've already sent all configured reminders
-        if reminders_sent >= len(settings.reminder_days):
-            return None
+        # Update last run timestamp
+        settings.update_last_run()
+        self.reminder_repository.save(settings)
 
-        # Get the day threshold for the next reminder
-        next_threshold = settings.reminder_days[reminders_sent] if reminders_sent < len(settings.reminder_days) else None
+        logger.info("Queued %d reminders for owner %s", results['queued'], owner_id)
+        return results
 
-        # If no more thresholds, or not enough days overdue yet, don't send
-        if next_threshold is None or days_overdue < next_threshold:
-            return None
+    def deliver_reminder(self, owner_id: str, invoice_id: str, reminder_number: int) -> bool:
+        """
+        Send one queued reminder and record it.
 
-        # Return the 1-based reminder number
-        return reminders_sent + 1
+        Called by the email worker; use enqueue_reminders to queue reminders.
+        The reminder is claimed atomically before it is sent, so a reminder
+        queued twice, redelivered, or already sent by process_reminders is
+        only sent once. The claim is part of the caller's transaction; if
+        the send fails the raised error rolls it back for the retry.
+
+        Args:
+            owner_id: ID of the owner whose settings apply.
+            invoice_id: ID of the invoice to remind.
+            reminder_number: Which reminder in the sequence (1-based).
+
+        Returns:
+            True if the reminder was sent, False if it is no longer due.
+
+        Raises:
+            EmailDeliveryError: If sending failed; the worker retries the task.
+        """
+        settings = self.get_settings(owner_id)
+        now = datetime.now()
+
+        # Claim the reminder, unless the invoice was paid or it was sent since it was queued
+        invoice = self.invoice_repository.claim_reminder(
+            invoice_id, owner_id, settings.reminder_days, reminder_number, now
+        )
+        if invoice is None:
+            return False
+
+        days_overdue = (now - invoice.due_date).days
+
+        with self.email_service.open_session() as smtp:
+            sent = self._send_reminder(invoice, reminder_number, days_overdue, settings, smtp)
+
+        if not sent:
+            raise EmailDeliveryError(f"Failed to send reminder for invoice {invoice.invoice_number}")
+
+        logger.info("Sent reminder #%d for invoice %s", reminder_number, invoice.invoice_number)
+        return True
 
     def _send_reminder(self, invoice: Invoice, reminder_number: int,
-                       days_overdue: int, settings: ReminderSettings) -> bool:
+                       days_overdue: int, settings: ReminderSettings,
+                       smtp: EmailSession) -> bool:
         """
         Send a reminder email for an invoice.
 
@@ -205,46 +439,72 @@ class ReminderService:
             reminder_number: Which reminder in the sequence (1-based).
             days_overdue: Number of days the invoice is overdue.
             settings: Reminder settings.
+            smtp: Open email session to send on.
 
         Returns:
             True if reminder was sent successfully, False otherwise.
         """
         try:
-            # Get reminder template
-            subject_template, message_template = settings.get_reminder_template(reminder_number)
+            email = self._build_reminder(invoice, reminder_number, days_overdue, settings)
 
-            # Format template variables
-            template_vars = {
-                'invoice_number': invoice.invoice_number,
-                'customer_name': invoice.customer_name,
-                'issue_date': invoice.issue_date.strftime('%Y-%m-%d'),
-                'due_date': invoice.due_date.strftime('%Y-%m-%d'),
-                'days_overdue': days_overdue,
-                'currency': invoice.currency,
-                'total': f"{invoice.total:.2f}",
-                'reminder_number': reminder_number
-            }
+            # Send email
+            return smtp.send(**email)
+        except Exception as e:
+            logger.error("Error sending reminder for invoice %s: %s", invoice.invoice_number, e)
+            return False
 
-            # Format subject and message
-            subject = subject_template.format(**template_vars)
-            message = message_template.format(**template_vars)
+    def _build_reminder(self, invoice: Invoice, reminder_number: int,
+                        days_overdue: int, settings: ReminderSettings,
+                        templates: Optional[Dict[int, Tuple[str, str]]] = None) -> Dict[str, Any]:
+        """
+        Build the reminder email for an invoice, including its PDF.
 
-            # Generate PDF
-            pdf_bytes = self.pdf_service.generate_invoice_pdf(invoice)
+        Args:
+            invoice: Invoice to send reminder for.
+            reminder_number: Which reminder in the sequence (1-based).
+            days_overdue: Number of days the invoice is overdue.
+            settings: Reminder settings.
+            templates: Optional cache of reminder templates for the current run.
 
-            # Send email
-            return self.email_service.send_email(
-                to_email=invoice.customer_email,
-                subject=subject,
-                message=message,
-                attachments=[
-                    {
-                        'filename': f"Invoice_{invoice.invoice_number}.pdf",
-                        'content': pdf_bytes,
-                        'content_type': 'application/pdf'
-                    }
-                ]
-            )
-        except Exception as e:
-            logger.error(f"Error sending reminder for invoice {invoice.invoice_number}: {str(e)}")
-            return False
\ No newline at end of file
+        Returns:
+            Keyword arguments for EmailSession.send.
+        """
+        # Get reminder template
+        if templates is None:
+            subject_template, message_template = settings.get_reminder_template(reminder_number)
+        else:
+            if reminder_number not in templates:
+                templates[reminder_number] = settings.get_reminder_template(reminder_number)
+            subject_template, message_template = templates[reminder_number]
+
+        # Format template variables
+        template_vars = {
+            'invoice_number': invoice.invoice_number,
+            'customer_name': invoice.customer_name,
+            'issue_date': invoice.issue_date.date().isoformat(),  # YYYY-MM-DD, without strftime
+            'due_date': invoice.due_date.date().isoformat(),
+            'days_overdue': days_overdue,
+            'currency': invoice.currency,
+            'total': f"{invoice.total:.2f}",
+            'reminder_number': reminder_number
+        }
+
+        # Format subject and message
+        subject = subject_template.format(**template_vars)
+        message = message_template.format(**template_vars)
+
+        # Generate PDF
+        pdf_bytes = self.pdf_service.generate_invoice_pdf(invoice)
+
+        return {
+            'to_email': invoice.customer_email,
+            'subject': subject,
+            'message': message,
+            'attachments': [
+                {
+                    'filename': f"Invoice_{invoice.invoice_number}.pdf",
+                    'content': pdf_bytes,
+                    'content_type': 'application/pdf'
+                }
+            ]
+        }
@@ -1,18 +1,32 @@
-from setuptools import setup, find_packages
+from setuptools import setup
 
 setup(
     name="invoice_app",
     version="0.1.0",
-    packages=find_packages(),
+    packages=[
+        "api",
+        "config",
+        "database",
+        "database.migrations",
+        "invoice_app",
+        "models",
+        "repositories",
+        "services",
+        "tasks",
+        "utils",
+    ],
     install_requires=[
         "fastapi==0.104.1",
         "uvicorn[standard]==0.24.0",
         "pydantic==2.4.2",
         "pydantic-settings==2.1.0",
         "sqlalchemy==2.0.23",
-        "psycopg2-binary==2.9.9",
+        "psycopg[binary]==3.1.13",
         "python-dotenv==1.0.0",
         "alembic==1.12.1",
         "email-validator==2.1.0",
+        "celery==5.3.6",
+        "redis==5.0.1",
+        "cachetools==5.3.2",
     ],
 ) 
\ No newline at end of file
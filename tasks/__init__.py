@@ -0,0 +1,6 @@
+"""
+Tasks package.
+
+This package contains Celery tasks that run outside the request cycle,
+such as sending emails.
+"""
@@ -0,0 +1,24 @@
+"""
+Celery application module.
+
+This module defines the Celery application used by background tasks.
+Email tasks are routed to a dedicated queue so their workers can be
+scaled independently of other work.
+"""
+from celery import Celery
+
+from invoice_app.config import get_settings
+
+EMAIL_QUEUE = 'email'
+
+settings = get_settings()
+
+celery_app = Celery('invoice_app', broker=settings.CELERY_BROKER_URL)
+
+celery_app.conf.update(
+    task_serializer='json',
+    accept_content=['json'],
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    include=['invoice_app.tasks.email_tasks'],
+)
@@ -0,0 +1,87 @@
+"""
+Email tasks module.
+
+This module contains Celery tasks that send transactional emails and
+payment reminders out of band, so request handlers only pay for the
+database commit.
+"""
+from invoice_app.db.base import get_db_session
+from invoice_app.tasks.celery_app import celery_app, EMAIL_QUEUE
+
+
+@celery_app.task(bind=True, queue=EMAIL_QUEUE, autoretry_for=(Exception,),
+                 retry_backoff=True, max_retries=5)
+def send_payment_receipt_task(self, payment_id: int) -> bool:
+    """
+    Send the receipt email for a recorded payment.
+
+    Args:
+        payment_id: ID of the payment to send a receipt for
+
+    Returns:
+        True if the email was sent, False if there was nothing to send
+
+    Raises:
+        EmailDeliveryError: If sending failed; the task is retried with backoff
+    """
+    # Imported here as payment_service imports this module
+    from invoice_app.services.payment_service import PaymentService
+
+    with get_db_session() as session:
+        return PaymentService(session).deliver_payment_receipt(payment_id)
+
+
+@celery_app.task(bind=True, queue=EMAIL_QUEUE, autoretry_for=(Exception,),
+                 retry_backoff=True, max_retries=5)
+def send_refund_notification_task(self, refund_id: int) -> bool:
+    """
+    Send the notification email for a processed refund.
+
+    Args:
+        refund_id: ID of the refund payment
+
+    Returns:
+        True if the email was sent, False if there was nothing to send
+
+    Raises:
+        EmailDeliveryError: If sending failed; the task is retried with backoff
+    """
+    # Imported here as payment_service imports this module
+    from invoice_app.services.payment_service import PaymentService
+
+    with get_db_session() as session:
+        return PaymentService(session).deliver_refund_notification(refund_id)
+
+
+@celery_app.task(bind=True, queue=EMAIL_QUEUE, autoretry_for=(Exception,),
+                 retry_backoff=True, max_retries=5)
+def send_reminder_task(self, invoice_id: str, reminder_number: int, owner_id: str) -> bool:
+    """
+    Send one payment reminder queued by ReminderService.enqueue_reminders.
+
+    Args:
+        invoice_id: ID of the overdue invoice
+        reminder_number: Which reminder in the sequence (1-based)
+        owner_id: ID of the owner whose reminder settings apply
+
+    Returns:
+        True if the reminder was sent, False if it is no longer due
+
+    Raises:
+        EmailDeliveryError: If sending failed; the task is retried with backoff
+    """
+    # Imported here as reminder_service imports this module
+    from invoice_app.repositories.invoice_repository import InvoiceRepository
+    from invoice_app.repositories.reminder_repository import ReminderRepository
+    from invoice_app.services.email_service import EmailService
+    from invoice_app.services.pdf_service import PDFService
+    from invoice_app.services.reminder_service import ReminderService
+
+    with get_db_session() as session:
+        service = ReminderService(
+            InvoiceRepository(session),
+            ReminderRepository(session),
+            EmailService(),
+            PDFService()
+        )
+        return service.deliver_reminder(owner_id, invoice_id, reminder_number)
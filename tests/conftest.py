@@ -0,0 +1,38 @@
+"""
+Shared pytest fixtures.
+
+Repository tests that exercise PostgreSQL-specific SQL (CTEs, RETURNING,
+UPDATE ... FROM VALUES) run against the database named by
+TEST_DATABASE_URL and are skipped when it is not set.
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+
+@pytest.fixture
+def pg_session():
+    """Session on a PostgreSQL connection, rolled back after the test."""
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    base = pytest.importorskip("app.models.base")
+
+    engine = create_engine(url)
+    connection = engine.connect()
+    transaction = connection.begin()
+
+    # Create the schema inside the transaction, so the rollback drops it again
+    base.Base.metadata.create_all(connection)
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+        engine.dispose()
@@ -0,0 +1,55 @@
+"""
+Tests for the database session helpers.
+"""
+import os
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+from invoice_app.db.base import engine, get_db, run_after_commit
+
+
+def test_failing_after_commit_callback_does_not_raise():
+    session = Session(bind=create_engine("sqlite://"))
+    ran = []
+
+    def fail():
+        raise RuntimeError("broker unavailable")
+
+    run_after_commit(session, fail)
+    run_after_commit(session, lambda: ran.append(True))
+    session.commit()
+
+    assert ran == [True]
+
+
+def test_after_commit_callbacks_are_dropped_on_rollback():
+    session = Session(bind=create_engine("sqlite://"))
+    ran = []
+
+    session.execute(text("SELECT 1"))
+    run_after_commit(session, lambda: ran.append(True))
+    session.rollback()
+    session.commit()
+
+    assert ran == []
+
+
+def test_get_db_does_not_commit(monkeypatch):
+    committed = []
+    monkeypatch.setattr(Session, "commit", lambda self: committed.append(self))
+
+    dependency = get_db()
+    next(dependency)
+    dependency.close()
+
+    assert committed == []
+
+
+def test_engine_uses_configured_queue_pool():
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.size() == int(os.getenv("DB_POOL_SIZE", "10"))
+    assert engine.pool._max_overflow == int(os.getenv("DB_MAX_OVERFLOW", "5"))
+    assert engine.pool._timeout == int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    assert engine.pool._recycle == int(os.getenv("DB_POOL_RECYCLE", "1800"))
@@ -0,0 +1,40 @@
+"""
+Fixtures for repository tests.
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+
+@pytest.fixture
+def make_invoice(pg_session):
+    """Factory creating a user, a customer and an invoice owned by them."""
+    pytest.importorskip("app.models.invoice")
+
+    from app.models.customer import Customer
+    from app.models.invoice import InvoiceStatus
+    from app.models.user import User
+    from app.repositories.invoice_repository import InvoiceRepository
+
+    def make(status=InvoiceStatus.SENT, amount=100.0, **kwargs):
+        suffix = uuid4().hex
+        user = User(email=f"owner-{suffix}@example.com", password="secret")
+        pg_session.add(user)
+        pg_session.flush()
+
+        customer = Customer(user_id=user.id, name="Customer", email=f"customer-{suffix}@example.com")
+        pg_session.add(customer)
+        pg_session.flush()
+
+        kwargs.setdefault('due_date', datetime.utcnow() + timedelta(days=30))
+        return InvoiceRepository(pg_session).create_invoice(
+            user_id=user.id,
+            customer_id=customer.id,
+            amount=amount,
+            vat_rate=0,
+            status=status,
+            **kwargs
+        )
+
+    return make
@@ -0,0 +1,47 @@
+"""
+Tests for the invoice repository.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("app.models.invoice")
+
+from app.models.invoice import InvoiceStatus
+from app.repositories.invoice_repository import InvoiceRepository
+from app.repositories.payment_repository import PaymentRepository
+
+
+def test_partial_refund_round_trips_status(pg_session, make_invoice):
+    invoice = make_invoice()
+    PaymentRepository(pg_session).record_payment_atomic(invoice.id, 100.0)
+
+    updated = InvoiceRepository(pg_session).apply_refund(invoice.id, 30.0)
+    assert updated.status == InvoiceStatus.PARTIALLY_PAID
+
+    pg_session.expire_all()
+    reloaded = InvoiceRepository(pg_session).get_by_id(invoice.id)
+    assert reloaded.status == InvoiceStatus.PARTIALLY_PAID
+    assert reloaded.amount_paid == 70.0
+
+
+def test_full_refund_returns_invoice_to_sent(pg_session, make_invoice):
+    invoice = make_invoice()
+    PaymentRepository(pg_session).record_payment_atomic(invoice.id, 100.0)
+
+    InvoiceRepository(pg_session).apply_refund(invoice.id, 100.0)
+
+    pg_session.expire_all()
+    assert InvoiceRepository(pg_session).get_by_id(invoice.id).status == InvoiceStatus.SENT
+
+
+def test_iter_batches_by_status_skips_invoices_not_yet_due(pg_session, make_invoice):
+    now = datetime.utcnow()
+    overdue = make_invoice(due_date=now - timedelta(days=1))
+    make_invoice(due_date=now + timedelta(days=1))
+
+    batches = list(InvoiceRepository(pg_session).iter_batches_by_status(
+        InvoiceStatus.SENT, batch_size=1, due_before=now
+    ))
+
+    assert [[invoice.id for invoice in batch] for batch in batches] == [[overdue.id]]
@@ -0,0 +1,41 @@
+"""
+Tests for the payment repository.
+"""
+import pytest
+
+pytest.importorskip("app.models.payment")
+
+from app.models.invoice import InvoiceStatus
+from app.repositories.invoice_repository import InvoiceRepository
+from app.repositories.payment_repository import PaymentRepository
+
+
+def test_partial_payment_round_trips_status(pg_session, make_invoice):
+    invoice = make_invoice()
+
+    payment, updated = PaymentRepository(pg_session).record_payment_atomic(invoice.id, 40.0)
+
+    assert payment.amount == 40.0
+    assert updated.status == InvoiceStatus.PARTIALLY_PAID
+
+    # Reload from the database, which fails if the CASE wrote an invalid enum value
+    pg_session.expire_all()
+    reloaded = InvoiceRepository(pg_session).get_by_id(invoice.id)
+    assert reloaded.status == InvoiceStatus.PARTIALLY_PAID
+    assert reloaded.amount_paid == 40.0
+
+
+def test_full_payment_marks_invoice_paid(pg_session, make_invoice):
+    invoice = make_invoice()
+
+    _, updated = PaymentRepository(pg_session).record_payment_atomic(invoice.id, 100.0)
+
+    pg_session.expire_all()
+    assert InvoiceRepository(pg_session).get_by_id(updated.id).status == InvoiceStatus.PAID
+
+
+def test_payment_on_draft_invoice_is_not_recorded(pg_session, make_invoice):
+    invoice = make_invoice(status=InvoiceStatus.DRAFT)
+
+    assert PaymentRepository(pg_session).record_payment_atomic(invoice.id, 40.0) is None
+    assert PaymentRepository(pg_session).get_payments_for_invoice(invoice.id) == []
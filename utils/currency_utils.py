@@ -0,0 +1,50 @@
+"""
+Currency utilities for formatting monetary amounts.
+
+This module provides helpers for displaying amounts with the symbol or
+code of their currency.
+"""
+from functools import lru_cache
+from typing import Callable
+
+# Symbols for currencies shown with a prefix; others get a code suffix
+CURRENCY_SYMBOLS = {
+    'USD': '$',
+    'EUR': '€',
+    'GBP': '£',
+}
+
+
+@lru_cache(maxsize=32)
+def get_formatter(currency: str = 'USD') -> Callable[[float], str]:
+    """
+    Get a formatting function for a currency.
+
+    The lookup is done once per currency, so callers formatting many amounts
+    in the same currency (e.g. invoice lines) should fetch the formatter once
+    and reuse it.
+
+    Args:
+        currency: ISO 4217 currency code.
+
+    Returns:
+        Function that formats an amount in the given currency.
+    """
+    symbol = CURRENCY_SYMBOLS.get(currency)
+    if symbol:
+        return (symbol + '{:.2f}').format
+    return ('{:.2f} ' + currency).format
+
+
+def format_currency(amount: float, currency: str = 'USD') -> str:
+    """
+    Format an amount in a currency.
+
+    Args:
+        amount: Amount to format.
+        currency: ISO 4217 currency code.
+
+    Returns:
+        Formatted amount, e.g. "$12.50" or "12.50 CHF".
+    """
+    return get_formatter(currency)(amount)